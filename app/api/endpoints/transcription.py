@@ -1,340 +1,535 @@
 import os
-import uuid
+import orjson
 import asyncio
-import aiofiles
+import secrets
+import shutil
 import time
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, replace
+from fastapi import APIRouter, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse, Response
+from typing import Dict, Any, Final, Optional
 
 from app.config import settings
-from app.core.whisper_service import whisper_service
+from app.constants import ALLOWED_EXTENSIONS, ALLOWED_EXTENSIONS_DISPLAY, MAX_FILE_MB, MAX_FILE_SIZE
+from app.core.whisper_service import normalize_language, whisper_service
 from app.core.redis_semaphore import processing_semaphore
+from app.core.cleanup_service import TRASH_SUFFIX
+from app.utils.cache import TimedCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-# Estado simple en memoria (eliminar referencia a simple_state que no existe)
-processing_state = {
-    "is_processing": False,
-    "current_job": None
+
+@dataclass
+class ProcessingState:
+    """
+    Estado local del procesamiento
+
+    Solo se modifica desde el event loop y sin await entre campos, así que
+    cada transición es atómica para los lectores; snapshot() da una copia
+    consistente para quien lea varios campos cruzando awaits.
+
+    Con __slots__ (sin defaults: en 3.8 chocan con los slots) cada
+    snapshot es un objeto chico sin __dict__.
+    """
+    __slots__ = ("is_processing", "current_job", "started_ns")
+
+    is_processing: bool
+    current_job: Optional[str]
+    started_ns: int  # perf_counter_ns al iniciar (monotónico)
+
+    def start(self, job_id: str):
+        self.is_processing = True
+        self.current_job = job_id
+        self.started_ns = time.perf_counter_ns()
+
+    def finish(self):
+        self.is_processing = False
+        self.current_job = None
+        self.started_ns = 0
+
+    def snapshot(self) -> "ProcessingState":
+        return replace(self)
+
+
+processing_state = ProcessingState(is_processing=False, current_job=None, started_ns=0)
+
+# Constantes de upload precalculadas (límites y extensiones vienen de
+# app.constants): lecturas de hot path como LOAD_GLOBAL, no atributos pydantic
+_STREAM_FILE_THRESHOLD: Final[int] = settings.STREAM_FILE_THRESHOLD
+_UPLOAD_STREAM_CHUNK: Final[int] = settings.UPLOAD_STREAM_CHUNK
+_UPLOAD_PREFIX: Final[str] = os.path.join(settings.UPLOAD_DIR, "")  # Directorio + separador
+_HAS_SENDFILE: Final[bool] = hasattr(os, "sendfile")
+
+# Plantillas de respuestas frecuentes (solo se completan campos dinámicos)
+_VALIDATION_ERROR = "Error de validación"
+_UNAVAILABLE_TEMPLATE = {
+    "error": "Servicio Whisper no disponible",
+    "message": "Modelo no cargado o sistema ocupado",
+    "retry_after": 15
+}
+_UNAVAILABLE_HEADERS = {"Retry-After": "15"}
+_BUSY_TEMPLATE = {
+    "status": "processing",
+    "message": "Sistema ocupado, otro proceso en curso",
+    "retry_after": 10,
+    "note": "Tu archivo fue validado correctamente, reintenta en unos segundos"
+}
+# Rechazo del fast path local: el upload todavía no se validó
+_BUSY_LOCAL_TEMPLATE = {
+    "status": "processing",
+    "message": "Sistema ocupado, otro proceso en curso",
+    "retry_after": 10,
+    "note": "Reintenta en unos segundos"
 }
 
+# Admisión local por proceso: rechaza "ocupado" sin tocar Redis
+# (el lock Redis se mantiene para coherencia entre workers y /status)
+_local_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_JOBS)
+
+# Referencias a tareas de limpieza de temporales (evita que el GC las cancele)
+_background_tasks = set()
+
+# Caché corto para probes de balanceadores (evita Redis/CUDA por cada hit)
+_health_cache = TimedCache(settings.HEALTH_CACHE_TTL)
+_status_cache = TimedCache(settings.STATUS_CACHE_TTL)
+
+
+def _ms(start_ns: int) -> float:
+    """Milisegundos transcurridos desde start_ns (reloj monotónico)"""
+    return round((time.perf_counter_ns() - start_ns) / 1_000_000, 1)
+
+
+def _error(status: int, error: str, details: str, start_ns: int, **extra) -> ORJSONResponse:
+    """Respuesta de error estándar del endpoint de transcripción"""
+    return ORJSONResponse(
+        status_code=status,
+        content={
+            "error": error,
+            "details": details,
+            **extra,
+            "response_time_ms": _ms(start_ns)
+        }
+    )
+
 
 class ValidationError(Exception):
     """Error de validación rápida"""
     pass
 
 
-async def ultra_fast_validation(file: UploadFile) -> Dict[str, Any]:
+async def ultra_fast_validation(file: UploadFile, language: Optional[str] = None) -> Dict[str, Any]:
     """Validación ultra-rápida sin operaciones costosas"""
 
     if not file.filename:
         raise ValidationError("Nombre de archivo requerido")
 
-    # Validar extensión
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
+    # Validar extensión (rfind: sin el parsing completo de os.path)
+    filename = file.filename
+    dot = filename.rfind('.')
+    file_ext = filename[dot:].lower() if dot >= 0 else ''
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise ValidationError(
             f"Formato no soportado: {file_ext}. "
-            f"Permitidos: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+            f"Permitidos: {ALLOWED_EXTENSIONS_DISPLAY}"
         )
 
     # Validar tamaño si está disponible
     if hasattr(file, 'size') and file.size:
-        if file.size > settings.MAX_FILE_SIZE:
+        if file.size > MAX_FILE_SIZE:
             size_mb = file.size / (1024 * 1024)
-            max_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
             raise ValidationError(
-                f"Archivo muy grande: {size_mb:.1f}MB. Máximo: {max_mb}MB"
+                f"Archivo muy grande: {size_mb:.1f}MB. Máximo: {MAX_FILE_MB}MB"
             )
 
+    # Idioma contra los códigos de Whisper: antes del lock y del decode
+    try:
+        language = normalize_language(language)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
     return {
         "filename": file.filename,
         "extension": file_ext,
-        "size": getattr(file, 'size', None)
+        "size": getattr(file, 'size', None),
+        "language": language
     }
 
 
-async def stream_file_to_disk(file: UploadFile, filepath: str) -> int:
-    """Guardar archivo usando streaming para memoria mínima"""
+def _write_bytes(filepath: str, data: bytes) -> None:
+    """Escritura única (bloqueante) para archivos pequeños"""
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+
+def _sendfile_copy(src, filepath: str, size: int, chunk_size: int) -> bool:
+    """
+    Copia kernel→kernel con os.sendfile si el spool ya está en disco
+
+    Returns:
+        False si no aplica (spool en RAM o sendfile no soportado) o si la
+        copia quedó corta: el caller rehace la copia normal
+    """
+    if not _HAS_SENDFILE or not getattr(src, "_rolled", False):
+        return False
+
+    src_fd = src.fileno()
+    offset = src.tell()
+    end = offset + size
+    dst_fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        while offset < end:
+            sent = os.sendfile(dst_fd, src_fd, offset, min(chunk_size, end - offset))
+            if sent == 0:
+                # EOF antes de `size` bytes: no dar por buena una copia truncada
+                return False
+            offset += sent
+    except OSError:
+        # FS sin soporte (EINVAL/ENOSYS): el caller usa la copia normal
+        return False
+    finally:
+        os.close(dst_fd)
+    return True
+
+
+def _copy_validated(src, filepath: str, size: int, chunk_size: int) -> None:
+    """Copia (bloqueante) de un upload cuyo tamaño ya fue validado"""
+    if _sendfile_copy(src, filepath, size, chunk_size):
+        return
+
+    with open(filepath, 'wb', buffering=chunk_size) as f:
+        shutil.copyfileobj(src, f, chunk_size)
+
+
+def _copy_to_disk(src, filepath: str, chunk_size: int) -> int:
+    """Copia secuencial (bloqueante) del spool del upload al disco"""
     total_size = 0
-    chunk_size = 8192  # 8KB chunks
+    with open(filepath, 'wb', buffering=chunk_size) as f:
+        while chunk := src.read(chunk_size):
+            total_size += len(chunk)
+            if total_size > MAX_FILE_SIZE:
+                # Cortar antes de escribir; el caller limpia el parcial
+                raise ValidationError(
+                    f"Archivo excede tamaño máximo: {total_size / (1024 * 1024):.1f}MB"
+                )
+            f.write(chunk)
+    return total_size
+
+
+async def stream_file_to_disk(file: UploadFile, filepath: str) -> int:
+    """
+    Guardar archivo con un solo salto a thread por upload
+
+    Si el tamaño ya se conoce (y ultra_fast_validation lo validó) no se
+    vuelve a contar byte a byte: la copia es una sola pasada sin checks.
+    """
+    loop = asyncio.get_running_loop()
+    chunk_size = _UPLOAD_STREAM_CHUNK
 
     try:
-        async with aiofiles.open(filepath, 'wb') as f:
-            while chunk := await file.read(chunk_size):
-                total_size += len(chunk)
-                if total_size > settings.MAX_FILE_SIZE:
-                    await f.close()
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
-                    raise ValidationError(
-                        f"Archivo excede tamaño máximo: {total_size / (1024 * 1024):.1f}MB"
-                    )
-                await f.write(chunk)
-
-        return total_size
+        if file.size is not None:
+            if file.size <= _STREAM_FILE_THRESHOLD:
+                # Archivo pequeño: una lectura y una escritura
+                data = await file.read()
+                await loop.run_in_executor(None, _write_bytes, filepath, data)
+                return len(data)
+
+            # Archivo grande ya validado: copia directa en un único thread
+            await loop.run_in_executor(
+                None, _copy_validated, file.file, filepath, file.size, chunk_size
+            )
+            return file.size
+
+        # Tamaño desconocido: copia contando bytes contra MAX_FILE_SIZE
+        return await loop.run_in_executor(
+            None, _copy_to_disk, file.file, filepath, chunk_size
+        )
 
     except Exception as e:
-        if os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-            except:
-                pass
+        # Un solo syscall: sin exists() previo
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
         raise
 
 
+def _spawn_background(coro) -> None:
+    """Lanzar tarea en background conservando una referencia fuerte"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _trash_temp(temp_path: str) -> None:
+    """
+    Marcar el temporal para borrado diferido (rename atómico; el unlink
+    lo hace cleanup_service.sweep_trash en background)
+    """
+    try:
+        os.replace(temp_path, temp_path + TRASH_SUFFIX)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("⚠️ No se pudo marcar %s: %s", temp_path, e)
+
+
+def _busy_response(
+    start_ns: int,
+    current_status: Dict[str, Any],
+    template: Dict[str, Any] = _BUSY_TEMPLATE
+) -> ORJSONResponse:
+    """Respuesta 202 de sistema ocupado"""
+    # None si el otro request todavía está validando (sin job asignado)
+    current_job = current_status.get("job_id")
+    headers = {"Retry-After": "10", "X-Processing-Status": "busy"}
+    if current_job:
+        headers["X-Current-Job"] = current_job
+
+    return ORJSONResponse(
+        status_code=202,  # Accepted - Processing
+        content={
+            **template,
+            "current_job": current_job,
+            "current_filename": current_status.get("filename"),
+            "elapsed_seconds": current_status.get("elapsed_seconds", 0),
+            "estimated_remaining_seconds": current_status.get("estimated_remaining_seconds", 30),
+            "response_time_ms": _ms(start_ns)
+        },
+        headers=headers
+    )
+
+
 @router.post("/transcribe")
-async def transcribe_audio_sync(file: UploadFile = File(...)) -> JSONResponse:
+async def transcribe_audio_sync(
+    file: UploadFile = File(...),
+    language: Optional[str] = Form(None)
+) -> ORJSONResponse:
     """
     Endpoint de transcripción síncrona con control Redis robusto
 
-    - Verifica estado con Redis antes de procesar
+    - Fast path local: si el proceso ya está ocupado responde sin Redis
+    - Admisión única con SET NX en Redis (sin pre-chequeo)
     - Solo permite un proceso a la vez
     - Responde inmediatamente si está ocupado
+    - `language` (opcional, ej. "es") evita la autodetección de idioma
     """
-    start_time = time.time()
-    global processing_state
+    start_ns = time.perf_counter_ns()
+
+    # === FAST PATH LOCAL (sin round-trip a Redis) ===
+    if _local_semaphore.locked():
+        return _busy_response(start_ns, {"job_id": processing_state.current_job}, _BUSY_LOCAL_TEMPLATE)
+
+    # Sin await entre el chequeo y el acquire: la admisión es inmediata.
+    # _transcribe_admitted es dueño del slot y lo libera antes de responder
+    await _local_semaphore.acquire()
+    return await _transcribe_admitted(file, start_ns, language)
 
-    # === VERIFICAR ESTADO CON REDIS (< 5ms) ===
-    if await processing_semaphore.is_processing():
-        # Sistema ocupado, obtener detalles del proceso actual
-        current_status = await processing_semaphore.get_current_status()
 
-        if current_status:
-            return JSONResponse(
-                status_code=202,  # Accepted - Processing
+async def _transcribe_admitted(file: UploadFile, start_ns: int, language: Optional[str] = None) -> ORJSONResponse:
+    """Transcripción de un request ya admitido por el semáforo local"""
+    # Referencias locales (LOAD_FAST en vez de global + atributo)
+    semaphore = processing_semaphore
+    state = processing_state
+    service = whisper_service
+
+    try:
+        # === VALIDACIONES RÁPIDAS ===
+        try:
+            file_info = await ultra_fast_validation(file, language)
+        except ValidationError as e:
+            return _error(400, _VALIDATION_ERROR, str(e), start_ns)
+
+        # === VERIFICAR SERVICIO WHISPER ===
+        if not await service.can_process_job():
+            return ORJSONResponse(
+                status_code=503,
                 content={
-                    "status": "processing",
-                    "message": "Sistema procesando otro audio",
-                    "current_job": current_status.get("job_id"),
-                    "current_filename": current_status.get("filename"),
-                    "elapsed_seconds": current_status.get("elapsed_seconds", 0),
-                    "estimated_remaining_seconds": current_status.get("estimated_remaining_seconds", 30),
-                    "retry_after": 10,
-                    "response_time_ms": round((time.time() - start_time) * 1000, 1)
+                    **_UNAVAILABLE_TEMPLATE,
+                    "response_time_ms": _ms(start_ns)
                 },
-                headers={
-                    "Retry-After": "10",
-                    "X-Processing-Status": "busy",
-                    "X-Current-Job": current_status.get("job_id", "unknown")
-                }
+                headers=_UNAVAILABLE_HEADERS
             )
 
-    # === VALIDACIONES RÁPIDAS ===
-    try:
-        file_info = await ultra_fast_validation(file)
-    except ValidationError as e:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "error": "Error de validación",
-                "details": str(e),
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            }
-        )
+        # === INTENTAR ADQUIRIR LOCK ===
+        job_id = secrets.token_hex(4)  # 8 hex chars sin objeto UUID
+        temp_path = None
 
-    # === VERIFICAR SERVICIO WHISPER ===
-    if not await whisper_service.can_process_job():
-        return JSONResponse(
-            status_code=503,
-            content={
-                "error": "Servicio Whisper no disponible",
-                "message": "Modelo no cargado o sistema ocupado",
-                "retry_after": 15,
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            },
-            headers={"Retry-After": "15"}
-        )
+        if file.size is not None and not getattr(file.file, "_rolled", True):
+            # Upload completo en RAM (spool = STREAM_FILE_THRESHOLD): Whisper
+            # lee directo del buffer, sin escribir una copia en UPLOAD_DIR
+            file.file.seek(0)
+            audio_source = file.file
+            file_size = file.size
+        else:
+            temp_path = f"{_UPLOAD_PREFIX}{job_id}{file_info['extension']}"
 
-    # === INTENTAR ADQUIRIR LOCK ===
-    job_id = str(uuid.uuid4())[:8]
-    temp_filename = f"{job_id}{file_info['extension']}"
-    temp_path = os.path.join(settings.UPLOAD_DIR, temp_filename)
+            # Streaming del archivo primero (para obtener tamaño real)
+            try:
+                file_size = await stream_file_to_disk(file, temp_path)
+            except ValidationError as e:
+                return _error(400, "Error procesando archivo", str(e), start_ns)
+            except Exception as e:
+                return _error(500, "Error interno guardando archivo", str(e), start_ns)
+            audio_source = temp_path
+
+        # Preparar info del job
+        job_info = {
+            "filename": file_info["filename"],
+            "file_size": file_size,
+            "extension": file_info["extension"]
+        }
 
-    # Streaming del archivo primero (para obtener tamaño real)
-    try:
-        file_size = await stream_file_to_disk(file, temp_path)
-    except ValidationError as e:
-        return JSONResponse(
-            status_code=400,
-            content={
-                "error": "Error procesando archivo",
-                "details": str(e),
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            }
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Error interno guardando archivo",
-                "details": str(e),
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            }
-        )
+        # Intentar adquirir lock
+        lock_acquired = await semaphore.acquire_lock(job_id, job_info)
 
-    # Preparar info del job
-    job_info = {
-        "filename": file_info["filename"],
-        "file_size": file_size,
-        "extension": file_info["extension"]
-    }
+        if not lock_acquired:
+            # No se pudo adquirir lock, limpiar archivo y retornar ocupado
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
 
-    # Intentar adquirir lock
-    lock_acquired = await processing_semaphore.acquire_lock(job_id, job_info)
+            # Obtener estado actual (solo en el camino ocupado)
+            current_status = await semaphore.get_current_status() or {}
+            return _busy_response(start_ns, current_status)
 
-    if not lock_acquired:
-        # No se pudo adquirir lock, limpiar archivo y retornar ocupado
+        # === PROCESAMIENTO CON LOCK ADQUIRIDO ===
+        failed = False
         try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-        except:
-            pass
+            # Actualizar estado local
+            state.start(job_id)
 
-        # Obtener estado actual
-        current_status = await processing_semaphore.get_current_status()
+            logger.info("🎤 Iniciando transcripción %s: %s (%d bytes)", job_id, file_info["filename"], file_size)
 
-        return JSONResponse(
-            status_code=202,
-            content={
-                "status": "processing",
-                "message": "Sistema ocupado, otro proceso en curso",
-                "current_job": current_status.get("job_id", "unknown") if current_status else "unknown",
-                "retry_after": 10,
-                "note": "Tu archivo fue validado correctamente, reintenta en unos segundos",
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            },
-            headers={"Retry-After": "10"}
-        )
+            # Transcripción directa
+            result = await service.transcribe_audio(audio_source, language=file_info["language"])
 
-    # === PROCESAMIENTO CON LOCK ADQUIRIDO ===
-    try:
-        # Actualizar estado local
-        processing_state["is_processing"] = True
-        processing_state["current_job"] = job_id
+            # Agregar metadatos
+            result.update({
+                "job_id": job_id,
+                "filename": file_info["filename"],
+                "file_size": file_size,
+                "status": "completed",
+                "total_time": (time.perf_counter_ns() - start_ns) / 1_000_000_000,
+                "response_time_ms": _ms(start_ns)
+            })
 
-        logger.info(f"🎤 Iniciando transcripción {job_id}: {file_info['filename']} ({file_size} bytes)")
+            logger.info(
+                "✅ Transcripción %s completada en %.2fs (velocidad: %.1fx)",
+                job_id, result["total_time"], result.get("speed", 0)
+            )
 
-        # Transcripción directa
-        result = await whisper_service.transcribe_audio(temp_path)
+            return ORJSONResponse(
+                status_code=200,
+                content=result,
+                headers={
+                    "X-Job-ID": job_id,
+                    "X-Processing-Time": f"{result['total_time']:.2f}s",
+                    "X-Speed": f"{result.get('speed', 0):.1f}x",
+                    "X-File-Size": str(file_size)
+                }
+            )
 
-        # Agregar metadatos
-        result.update({
-            "job_id": job_id,
-            "filename": file_info["filename"],
-            "file_size": file_size,
-            "status": "completed",
-            "total_time": time.time() - start_time,
-            "response_time_ms": round((time.time() - start_time) * 1000, 1)
-        })
+        except Exception as e:
+            logger.error("❌ Error transcripción %s: %s", job_id, e)
+            failed = True
 
-        logger.info(f"✅ Transcripción {job_id} completada en {result['total_time']:.2f}s (velocidad: {result.get('speed', 0):.1f}x)")
+            return _error(500, "Error durante transcripción", str(e), start_ns, job_id=job_id)
 
-        return JSONResponse(
-            status_code=200,
-            content=result,
-            headers={
-                "X-Job-ID": job_id,
-                "X-Processing-Time": f"{result['total_time']:.2f}s",
-                "X-Speed": f"{result.get('speed', 0):.1f}x",
-                "X-File-Size": str(file_size)
-            }
-        )
+        finally:
+            # === LIMPIEZA GARANTIZADA ===
 
-    except Exception as e:
-        logger.error(f"❌ Error transcripción {job_id}: {e}")
+            # 1. Actualizar estado local
+            state.finish()
 
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Error durante transcripción",
-                "details": str(e),
-                "job_id": job_id,
-                "response_time_ms": round((time.time() - start_time) * 1000, 1)
-            }
-        )
+            # 2. Liberar el lock Redis antes de responder: un cliente que
+            #    reintenta apenas recibe la respuesta no rebota como ocupado
+            try:
+                await semaphore.release_lock(job_id)
+            except Exception as e:
+                logger.error("❌ Error liberando lock %s: %s", job_id, e)
+
+            # 3. Temporal: tras un error se marca antes de responder; en el
+            #    camino exitoso el rename queda fuera del camino crítico
+            if temp_path is not None:
+                if failed:
+                    await _trash_temp(temp_path)
+                else:
+                    _spawn_background(_trash_temp(temp_path))
 
     finally:
-        # === LIMPIEZA GARANTIZADA ===
-
-        # 1. Actualizar estado local
-        processing_state["is_processing"] = False
-        processing_state["current_job"] = None
+        # Slot local al final, después del lock Redis: un request nuevo no
+        # puede ser admitido localmente y rebotar contra el lock viejo
+        _local_semaphore.release()
+
+
+async def _build_status_payload() -> Dict[str, Any]:
+    """Armar payload de /status (Redis en un round-trip + Whisper)"""
+    start_ns = time.perf_counter_ns()
+
+    # Redis (un round-trip) y Whisper en paralelo
+    snapshot, service_status = await asyncio.gather(
+        processing_semaphore.get_snapshot(),
+        whisper_service.get_status()
+    )
+    current_status = snapshot["current_status"]
+    is_processing = snapshot["is_processing"]
+
+    # Construir respuesta
+    response_data = {
+        "system_status": "processing" if is_processing else "available",
+        "is_processing": is_processing,
+        "can_accept_new": not is_processing and service_status["can_accept_jobs"],
+        "redis_connected": snapshot["redis_ok"]
+    }
 
-        # 2. Liberar lock Redis
-        try:
-            await processing_semaphore.release_lock(job_id)
-        except Exception as e:
-            logger.error(f"❌ Error liberando lock {job_id}: {e}")
+    # Agregar detalles del proceso actual si existe
+    if current_status:
+        response_data.update({
+            "current_process": {
+                "job_id": current_status.get("job_id"),
+                "filename": current_status.get("filename"),
+                "elapsed_seconds": current_status.get("elapsed_seconds"),
+                "estimated_remaining": current_status.get("estimated_remaining_seconds"),
+                "file_size_mb": round(current_status.get("file_size", 0) / (1024 * 1024), 2)
+            }
+        })
 
-        # 3. Limpiar archivo temporal
-        try:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                logger.debug(f"🗑️ Archivo temporal eliminado: {temp_path}")
-        except Exception as e:
-            logger.warning(f"⚠️ No se pudo eliminar {temp_path}: {e}")
+    # Información del servicio
+    response_data.update({
+        "service_info": {
+            "model_loaded": service_status["model_loaded"],
+            "memory_usage_mb": round(service_status["memory_info"].get("ram_usage_mb", 0), 1),
+            "gpu_memory_mb": round(service_status["memory_info"].get("gpu_memory_allocated_mb", 0), 1)
+        },
+        "configuration": {
+            "model_size": settings.MODEL_SIZE,
+            "max_file_size_mb": MAX_FILE_MB,
+            "supported_formats": settings.ALLOWED_EXTENSIONS,
+            "lazy_loading": settings.LAZY_MODEL_LOADING
+        },
+        "response_time_ms": _ms(start_ns)
+    })
+
+    return response_data
 
 
 @router.get("/status")
-async def get_processing_status() -> JSONResponse:
+async def get_processing_status() -> ORJSONResponse:
     """
     Estado actual del sistema con información Redis
+    (snapshot compartido por STATUS_CACHE_TTL entre pollers concurrentes)
     """
-    start_time = time.time()
-
     try:
-        # Estado del procesamiento desde Redis
-        current_status = await processing_semaphore.get_current_status()
-        is_processing = await processing_semaphore.is_processing()
-
-        # Estado del servicio Whisper
-        service_status = await whisper_service.get_status()
-
-        # Construir respuesta
-        response_data = {
-            "system_status": "processing" if is_processing else "available",
-            "is_processing": is_processing,
-            "can_accept_new": not is_processing and service_status["can_accept_jobs"],
-            "redis_connected": await processing_semaphore.health_check()
-        }
-
-        # Agregar detalles del proceso actual si existe
-        if current_status:
-            response_data.update({
-                "current_process": {
-                    "job_id": current_status.get("job_id"),
-                    "filename": current_status.get("filename"),
-                    "elapsed_seconds": current_status.get("elapsed_seconds"),
-                    "estimated_remaining": current_status.get("estimated_remaining_seconds"),
-                    "file_size_mb": round(current_status.get("file_size", 0) / (1024 * 1024), 2)
-                }
-            })
-
-        # Información del servicio
-        response_data.update({
-            "service_info": {
-                "model_loaded": service_status["model_loaded"],
-                "memory_usage_mb": round(service_status["memory_info"].get("ram_usage_mb", 0), 1),
-                "gpu_memory_mb": round(service_status["memory_info"].get("gpu_memory_allocated_mb", 0), 1)
-            },
-            "configuration": {
-                "model_size": settings.MODEL_SIZE,
-                "max_file_size_mb": settings.MAX_FILE_SIZE // (1024 * 1024),
-                "supported_formats": settings.ALLOWED_EXTENSIONS,
-                "lazy_loading": settings.LAZY_MODEL_LOADING
-            },
-            "response_time_ms": round((time.time() - start_time) * 1000, 1)
-        })
-
-        return JSONResponse(content=response_data)
+        response_data = await _status_cache.get_or_refresh(_build_status_payload)
+        return ORJSONResponse(content=response_data)
 
     except Exception as e:
-        logger.error(f"❌ Error obteniendo status: {e}")
-        return JSONResponse(
+        logger.error("❌ Error obteniendo status: %s", e)
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Error obteniendo estado del sistema",
@@ -344,7 +539,7 @@ async def get_processing_status() -> JSONResponse:
 
 
 @router.post("/cancel")
-async def cancel_processing() -> JSONResponse:
+async def cancel_processing() -> ORJSONResponse:
     """
     Cancelar procesamiento actual (liberación forzada del lock)
     """
@@ -352,7 +547,7 @@ async def cancel_processing() -> JSONResponse:
         current_status = await processing_semaphore.get_current_status()
 
         if not current_status:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "message": "No hay procesamiento en curso",
@@ -364,17 +559,19 @@ async def cancel_processing() -> JSONResponse:
         released = await processing_semaphore.force_release()
 
         if released:
+            _health_cache.invalidate()
+            _status_cache.invalidate()
             job_id = current_status.get("job_id", "unknown")
-            logger.info(f"🛑 Procesamiento {job_id} cancelado forzadamente")
+            logger.info("🛑 Procesamiento %s cancelado forzadamente", job_id)
 
-            return JSONResponse(content={
+            return ORJSONResponse(content={
                 "message": f"Procesamiento {job_id} cancelado",
                 "previous_job": job_id,
                 "note": "Lock liberado, sistema disponible para nuevos requests",
                 "status": "cancelled"
             })
         else:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={
                     "error": "No se pudo cancelar el procesamiento",
@@ -383,8 +580,8 @@ async def cancel_processing() -> JSONResponse:
             )
 
     except Exception as e:
-        logger.error(f"❌ Error cancelando: {e}")
-        return JSONResponse(
+        logger.error("❌ Error cancelando: %s", e)
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": "Error durante cancelación",
@@ -393,47 +590,66 @@ async def cancel_processing() -> JSONResponse:
         )
 
 
+async def _build_health_payload() -> Dict[str, Any]:
+    """Armar payload de /health (Redis en un round-trip + Whisper)"""
+    # Verificar componentes (Redis en un round-trip, en paralelo con Whisper)
+    snapshot, service_status = await asyncio.gather(
+        processing_semaphore.get_snapshot(),
+        whisper_service.get_status()
+    )
+    redis_ok = snapshot["redis_ok"]
+    is_processing = snapshot["is_processing"]
+
+    # Determinar estado general
+    if not redis_ok:
+        status = "unhealthy"
+    elif is_processing:
+        status = "processing"
+    elif not service_status["can_accept_jobs"]:
+        status = "degraded"
+    else:
+        status = "healthy"
+
+    return {
+        "status": status,
+        "components": {
+            "redis": redis_ok,
+            "whisper_service": service_status["can_accept_jobs"],
+            "model_loaded": service_status["model_loaded"]
+        },
+        "processing": {
+            "is_processing": is_processing,
+            "can_accept_requests": not is_processing and redis_ok
+        },
+        "memory": {
+            "ram_mb": round(service_status["memory_info"].get("ram_usage_mb", 0), 1),
+            "gpu_mb": round(service_status["memory_info"].get("gpu_memory_allocated_mb", 0), 1)
+        }
+    }
+
+
+async def _build_health_body() -> bytes:
+    """Payload de /health ya serializado: el caché guarda bytes listos"""
+    return orjson.dumps(await _build_health_payload())
+
+
 @router.get("/health")
-async def health_check() -> JSONResponse:
-    """Health check con verificación Redis"""
+async def health_check() -> Response:
+    """
+    Health check con verificación Redis (cacheado por HEALTH_CACHE_TTL)
+
+    Las ráfagas de probes (liveness/readiness) reenvían los mismos bytes
+    sin volver a serializar.
+    """
     try:
-        # Verificar componentes
-        redis_ok = await processing_semaphore.health_check()
-        service_status = await whisper_service.get_status()
-        is_processing = await processing_semaphore.is_processing()
-
-        # Determinar estado general
-        if not redis_ok:
-            status = "unhealthy"
-        elif is_processing:
-            status = "processing"
-        elif not service_status["can_accept_jobs"]:
-            status = "degraded"
-        else:
-            status = "healthy"
-
-        return JSONResponse(content={
-            "status": status,
-            "components": {
-                "redis": redis_ok,
-                "whisper_service": service_status["can_accept_jobs"],
-                "model_loaded": service_status["model_loaded"]
-            },
-            "processing": {
-                "is_processing": is_processing,
-                "can_accept_requests": not is_processing and redis_ok
-            },
-            "memory": {
-                "ram_mb": round(service_status["memory_info"].get("ram_usage_mb", 0), 1),
-                "gpu_mb": round(service_status["memory_info"].get("gpu_memory_allocated_mb", 0), 1)
-            }
-        })
+        body = await _health_cache.get_or_refresh(_build_health_body)
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "unhealthy",
                 "error": str(e)
             }
-        )
\ No newline at end of file
+        )
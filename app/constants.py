@@ -0,0 +1,16 @@
+import sys
+from typing import Final
+
+from app.config import settings
+
+# Límites de upload resueltos una vez al importar: el hot path lee
+# constantes de módulo en vez de atributos de Settings (pydantic)
+MAX_FILE_SIZE: Final[int] = settings.MAX_FILE_SIZE
+MAX_FILE_MB: Final[int] = MAX_FILE_SIZE // (1024 * 1024)
+
+# Extensiones en minúsculas e internadas: membership O(1) contra strings canónicos
+ALLOWED_EXTENSIONS: Final[frozenset] = frozenset(
+    sys.intern(ext.lower()) for ext in settings.ALLOWED_EXTENSIONS
+)
+# Lista preformateada para mensajes de error
+ALLOWED_EXTENSIONS_DISPLAY: Final[str] = ", ".join(sorted(ALLOWED_EXTENSIONS))
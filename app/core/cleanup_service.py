@@ -1,15 +1,84 @@
 import os
+import re
 import time
 import asyncio
-import glob
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.config import settings
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Sufijo de archivos ya procesados pendientes de borrar (ver sweep_trash)
+TRASH_SUFFIX = ".trash"
+
+# stat/unlink relativos a un fd del directorio (fstatat/unlinkat):
+# el kernel no vuelve a resolver la ruta completa por cada archivo
+_DIR_FD_OK = os.scandir in os.supports_fd and os.unlink in os.supports_dir_fd
+
+
+# Borrado paralelo para barridos grandes (unlink es latencia de syscall,
+# no CPU: los threads escalan bien)
+_PARALLEL_UNLINK_MIN = 256  # Por debajo, borrado serial
+_UNLINK_BATCH = 64
+_unlink_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cleanup-unlink")
+
+
+def _unlink_batch(dir_fd: Optional[int], batch: List[Tuple[str, int]]) -> Tuple[int, int]:
+    """Borrar un lote de (path, size); devuelve (borrados, bytes)"""
+    deleted = 0
+    size = 0
+    for path, file_size in batch:
+        try:
+            os.unlink(path, dir_fd=dir_fd)
+            deleted += 1
+            size += file_size
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("⚠️ Error eliminando %s: %s", path, e)
+    return deleted, size
+
+
+def _unlink_many(dir_fd: Optional[int], files: List[Tuple[str, int]]) -> Tuple[int, int]:
+    """Borrar (path, size) en serie o en paralelo según el volumen"""
+    if len(files) < _PARALLEL_UNLINK_MIN:
+        return _unlink_batch(dir_fd, files)
+
+    batches = [files[i:i + _UNLINK_BATCH] for i in range(0, len(files), _UNLINK_BATCH)]
+    deleted = 0
+    size = 0
+    for batch_deleted, batch_size in _unlink_pool.map(lambda b: _unlink_batch(dir_fd, b), batches):
+        deleted += batch_deleted
+        size += batch_size
+    return deleted, size
+
+
+@contextmanager
+def _scandir_at(path: str):
+    """
+    os.scandir sobre un fd de directorio abierto una sola vez
+
+    Yields:
+        (entries, dir_fd) - dir_fd es None si la plataforma no soporta fds
+        de directorio; en ambos casos vale os.unlink(entry.path, dir_fd=dir_fd)
+    """
+    if not _DIR_FD_OK:
+        with os.scandir(path) as entries:
+            yield entries, None
+        return
+
+    dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        with os.scandir(dir_fd) as entries:
+            yield entries, dir_fd
+    finally:
+        os.close(dir_fd)
+
 
 class CleanupService:
     """
@@ -18,9 +87,11 @@ class CleanupService:
 
     def __init__(self):
         self.cleanup_interval = 300  # 5 minutos
+        self.trash_sweep_interval = 30  # Barrido frecuente de *.trash
         self.max_file_age = settings.TEMP_FILE_CLEANUP * 60  # Convertir a segundos
         self.running = False
         self._cleanup_task = None
+        self._trash_task = None
 
     async def start_cleanup_task(self):
         """Iniciar tarea de limpieza en background"""
@@ -29,17 +100,19 @@ class CleanupService:
 
         self.running = True
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-        logger.info(f"🧹 Servicio de limpieza iniciado (cada {self.cleanup_interval}s)")
+        self._trash_task = asyncio.create_task(self._trash_loop())
+        logger.info("🧹 Servicio de limpieza iniciado (cada %ss)", self.cleanup_interval)
 
     async def stop_cleanup_task(self):
         """Detener tarea de limpieza"""
         self.running = False
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._cleanup_task, self._trash_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         logger.info("🛑 Servicio de limpieza detenido")
 
     async def _cleanup_loop(self):
@@ -51,53 +124,177 @@ class CleanupService:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"❌ Error en cleanup loop: {e}")
+                logger.error("❌ Error en cleanup loop: %s", e)
                 await asyncio.sleep(60)  # Esperar 1 minuto antes de reintentar
 
-    async def cleanup_temp_files(self) -> int:
+    async def _trash_loop(self):
+        """Loop de barrido de archivos ya procesados"""
+        while self.running:
+            try:
+                await self.sweep_trash()
+                await asyncio.sleep(self.trash_sweep_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("❌ Error en trash loop: %s", e)
+                await asyncio.sleep(60)
+
+    async def sweep_trash(self) -> int:
         """
-        Limpiar archivos temporales antiguos
-        
+        Borrar archivos marcados con TRASH_SUFFIX (en thread)
+
+        El endpoint solo renombra el temporal al terminar; el unlink real
+        se amortiza aquí fuera del camino crítico del request.
+
         Returns:
             Número de archivos eliminados
         """
         try:
-            upload_dir = Path(settings.UPLOAD_DIR)
-            if not upload_dir.exists():
-                return 0
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._sweep_trash_sync)
+
+        except Exception as e:
+            logger.error("❌ Error en sweep_trash: %s", e)
+            return 0
 
-            current_time = time.time()
-            files_deleted = 0
-            total_size_deleted = 0
+    def _sweep_trash_sync(self) -> int:
+        """Barrido bloqueante de *.trash (una sola pasada scandir)"""
+        files_deleted = 0
 
-            # Buscar todos los archivos en el directorio de uploads
-            for file_path in upload_dir.iterdir():
-                if file_path.is_file():
+        try:
+            with _scandir_at(settings.UPLOAD_DIR) as (entries, dir_fd):
+                for entry in entries:
+                    if not entry.name.endswith(TRASH_SUFFIX):
+                        continue
                     try:
-                        # Verificar edad del archivo
-                        file_age = current_time - file_path.stat().st_mtime
-                        
-                        if file_age > self.max_file_age:
-                            file_size = file_path.stat().st_size
-                            file_path.unlink()
-                            files_deleted += 1
-                            total_size_deleted += file_size
-                            
-                            logger.debug(f"🗑️ Eliminado: {file_path.name} ({file_size} bytes, {file_age/60:.1f}min)")
-                    
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error eliminando {file_path.name}: {e}")
-
-            if files_deleted > 0:
-                size_mb = total_size_deleted / (1024 * 1024)
-                logger.info(f"🧹 Cleanup: {files_deleted} archivos eliminados ({size_mb:.1f}MB liberados)")
-
-            return files_deleted
+                        os.unlink(entry.path, dir_fd=dir_fd)
+                        files_deleted += 1
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning("⚠️ Error eliminando %s: %s", entry.name, e)
+        except FileNotFoundError:
+            return 0
+
+        if files_deleted > 0:
+            logger.debug("🗑️ Trash: %s archivos eliminados", files_deleted)
+
+        return files_deleted
+
+    async def cleanup_temp_files(self) -> int:
+        """
+        Limpiar archivos temporales antiguos (en thread, sin bloquear el loop)
+        
+        Returns:
+            Número de archivos eliminados
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._cleanup_temp_files_sync)
 
         except Exception as e:
-            logger.error(f"❌ Error en cleanup_temp_files: {e}")
+            logger.error("❌ Error en cleanup_temp_files: %s", e)
             return 0
 
+    def _cleanup_temp_files_sync(self) -> int:
+        """Barrido bloqueante de archivos temporales (scandir + unlink)"""
+        return self._scan_and_optionally_cleanup(cleanup=True)["files_deleted"]
+
+    def _scan_and_optionally_cleanup(self, cleanup: bool) -> dict:
+        """
+        Una sola pasada por el directorio de uploads: estadísticas y,
+        opcionalmente, borrado de los archivos antiguos
+
+        DirEntry cachea tipo y stat, así que cada archivo cuesta un único
+        stat tanto para las estadísticas como para decidir su borrado.
+
+        Args:
+            cleanup: Eliminar los archivos con más de `max_file_age`
+        """
+        upload_dir = Path(settings.UPLOAD_DIR)
+        if not upload_dir.exists():
+            return {
+                "total_files": 0,
+                "total_size_mb": 0,
+                "old_files": 0,
+                "old_files_size_mb": 0,
+                "files_deleted": 0
+            }
+
+        current_time = time.time()
+        total_files = 0
+        total_size = 0
+        old_files = 0
+        old_files_size = 0
+        stale = []
+        files_deleted = 0
+        total_size_deleted = 0
+
+        with _scandir_at(upload_dir) as (entries, dir_fd):
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+
+                    # Un solo stat por archivo (tamaño y edad)
+                    st = entry.stat(follow_symlinks=False)
+                    file_size = st.st_size
+
+                    total_files += 1
+                    total_size += file_size
+
+                    if current_time - st.st_mtime > self.max_file_age:
+                        old_files += 1
+                        old_files_size += file_size
+                        if cleanup:
+                            stale.append((entry.path, file_size))
+
+                except OSError as e:
+                    logger.warning("⚠️ Error analizando %s: %s", entry.name, e)
+
+            # Borrado con el fd del directorio aún abierto
+            if stale:
+                files_deleted, total_size_deleted = _unlink_many(dir_fd, stale)
+
+        if files_deleted > 0:
+            size_mb = total_size_deleted / (1024 * 1024)
+            logger.info("🧹 Cleanup: %s archivos eliminados (%.1fMB liberados)", files_deleted, size_mb)
+
+        return {
+            "total_files": total_files,
+            "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "old_files": old_files,
+            "old_files_size_mb": round(old_files_size / (1024 * 1024), 2),
+            "cleanup_age_minutes": self.max_file_age / 60,
+            "files_deleted": files_deleted
+        }
+
+    async def cleanup_and_get_info(self) -> dict:
+        """
+        Limpiar archivos antiguos y obtener estadísticas en una sola pasada
+
+        Para dashboards que antes llamaban get_temp_files_info y
+        cleanup_temp_files seguidos (dos recorridos del directorio).
+        Las estadísticas reflejan el estado previo al borrado.
+
+        Returns:
+            Dict de get_temp_files_info más `files_deleted`
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._scan_and_optionally_cleanup, True)
+
+        except Exception as e:
+            logger.error("❌ Error en cleanup_and_get_info: %s", e)
+            return {
+                "total_files": 0,
+                "total_size_mb": 0,
+                "old_files": 0,
+                "old_files_size_mb": 0,
+                "files_deleted": 0,
+                "error": str(e)
+            }
+
     async def cleanup_old_files_by_pattern(self, pattern: str = "*") -> int:
         """
         Limpiar archivos específicos por patrón
@@ -109,33 +306,45 @@ class CleanupService:
             Número de archivos eliminados
         """
         try:
-            upload_dir = Path(settings.UPLOAD_DIR)
-            if not upload_dir.exists():
-                return 0
-
-            current_time = time.time()
-            files_deleted = 0
-
-            # Buscar archivos por patrón
-            for file_path in upload_dir.glob(pattern):
-                if file_path.is_file():
-                    try:
-                        file_age = current_time - file_path.stat().st_mtime
-                        
-                        if file_age > self.max_file_age:
-                            file_path.unlink()
-                            files_deleted += 1
-                            logger.debug(f"🗑️ Eliminado por patrón: {file_path.name}")
-                    
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error eliminando {file_path.name}: {e}")
-
-            return files_deleted
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._cleanup_old_files_by_pattern_sync, pattern)
 
         except Exception as e:
-            logger.error(f"❌ Error en cleanup por patrón: {e}")
+            logger.error("❌ Error en cleanup por patrón: %s", e)
             return 0
 
+    def _cleanup_old_files_by_pattern_sync(self, pattern: str) -> int:
+        """Barrido bloqueante por patrón (scandir + fnmatch + unlinkat)"""
+        upload_dir = Path(settings.UPLOAD_DIR)
+        if not upload_dir.exists():
+            return 0
+
+        current_time = time.time()
+        files_deleted = 0
+
+        # Patrón compilado una vez; match por nombre sin construir Paths
+        matches = re.compile(fnmatch.translate(pattern)).match
+
+        with _scandir_at(upload_dir) as (entries, dir_fd):
+            for entry in entries:
+                if not matches(entry.name):
+                    continue
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+
+                    file_age = current_time - entry.stat(follow_symlinks=False).st_mtime
+
+                    if file_age > self.max_file_age:
+                        os.unlink(entry.path, dir_fd=dir_fd)
+                        files_deleted += 1
+                        logger.debug("🗑️ Eliminado por patrón: %s", entry.name)
+
+                except OSError as e:
+                    logger.warning("⚠️ Error eliminando %s: %s", entry.name, e)
+
+        return files_deleted
+
     async def force_cleanup_all(self) -> int:
         """
         Forzar limpieza de TODOS los archivos temporales
@@ -145,33 +354,36 @@ class CleanupService:
             Número de archivos eliminados
         """
         try:
-            upload_dir = Path(settings.UPLOAD_DIR)
-            if not upload_dir.exists():
-                return 0
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._force_cleanup_all_sync)
 
-            files_deleted = 0
-            total_size = 0
+        except Exception as e:
+            logger.error("❌ Error en force_cleanup: %s", e)
+            return 0
 
-            for file_path in upload_dir.iterdir():
-                if file_path.is_file():
-                    try:
-                        file_size = file_path.stat().st_size
-                        file_path.unlink()
-                        files_deleted += 1
-                        total_size += file_size
-                        
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error eliminando {file_path.name}: {e}")
+    def _force_cleanup_all_sync(self) -> int:
+        """Borrado bloqueante de todos los temporales"""
+        upload_dir = Path(settings.UPLOAD_DIR)
+        if not upload_dir.exists():
+            return 0
 
-            if files_deleted > 0:
-                size_mb = total_size / (1024 * 1024)
-                logger.info(f"🧹 Cleanup forzado: {files_deleted} archivos ({size_mb:.1f}MB)")
+        files = []
 
-            return files_deleted
+        with _scandir_at(upload_dir) as (entries, dir_fd):
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        files.append((entry.path, entry.stat(follow_symlinks=False).st_size))
+                except OSError as e:
+                    logger.warning("⚠️ Error analizando %s: %s", entry.name, e)
 
-        except Exception as e:
-            logger.error(f"❌ Error en force_cleanup: {e}")
-            return 0
+            files_deleted, total_size = _unlink_many(dir_fd, files)
+
+        if files_deleted > 0:
+            size_mb = total_size / (1024 * 1024)
+            logger.info("🧹 Cleanup forzado: %s archivos (%.1fMB)", files_deleted, size_mb)
+
+        return files_deleted
 
     async def get_temp_files_info(self) -> dict:
         """
@@ -181,47 +393,11 @@ class CleanupService:
             Dict con estadísticas de archivos temporales
         """
         try:
-            upload_dir = Path(settings.UPLOAD_DIR)
-            if not upload_dir.exists():
-                return {
-                    "total_files": 0,
-                    "total_size_mb": 0,
-                    "old_files": 0,
-                    "old_files_size_mb": 0
-                }
-
-            current_time = time.time()
-            total_files = 0
-            total_size = 0
-            old_files = 0
-            old_files_size = 0
-
-            for file_path in upload_dir.iterdir():
-                if file_path.is_file():
-                    try:
-                        file_size = file_path.stat().st_size
-                        file_age = current_time - file_path.stat().st_mtime
-                        
-                        total_files += 1
-                        total_size += file_size
-                        
-                        if file_age > self.max_file_age:
-                            old_files += 1
-                            old_files_size += file_size
-                            
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error analizando {file_path.name}: {e}")
-
-            return {
-                "total_files": total_files,
-                "total_size_mb": round(total_size / (1024 * 1024), 2),
-                "old_files": old_files,
-                "old_files_size_mb": round(old_files_size / (1024 * 1024), 2),
-                "cleanup_age_minutes": self.max_file_age / 60
-            }
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._get_temp_files_info_sync)
 
         except Exception as e:
-            logger.error(f"❌ Error obteniendo info temp files: {e}")
+            logger.error("❌ Error obteniendo info temp files: %s", e)
             return {
                 "total_files": 0,
                 "total_size_mb": 0,
@@ -230,6 +406,12 @@ class CleanupService:
                 "error": str(e)
             }
 
+    def _get_temp_files_info_sync(self) -> dict:
+        """Estadísticas bloqueantes del directorio de uploads"""
+        info = self._scan_and_optionally_cleanup(cleanup=False)
+        del info["files_deleted"]
+        return info
+
     def update_cleanup_settings(self, cleanup_minutes: int = None, interval_seconds: int = None):
         """
         Actualizar configuración de limpieza dinámicamente
@@ -240,11 +422,11 @@ class CleanupService:
         """
         if cleanup_minutes is not None and cleanup_minutes > 0:
             self.max_file_age = cleanup_minutes * 60
-            logger.info(f"🔧 Edad máxima archivos actualizada: {cleanup_minutes} minutos")
+            logger.info("🔧 Edad máxima archivos actualizada: %s minutos", cleanup_minutes)
 
         if interval_seconds is not None and interval_seconds >= 60:
             self.cleanup_interval = interval_seconds
-            logger.info(f"🔧 Intervalo cleanup actualizado: {interval_seconds} segundos")
+            logger.info("🔧 Intervalo cleanup actualizado: %s segundos", interval_seconds)
 
 
 # Instancia global del servicio de limpieza
@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from app.config import settings
+
+# Carga única del modelo por proceso, compartida entre run.py (que la
+# dispara mientras corren los chequeos de inicio) y whisper_service
+_model_future: Optional[Future] = None
+_model_lock = threading.Lock()
+
+# Publicación de settings.DEVICE/COMPUTE_TYPE: el thread de precarga los
+# resuelve y recién entonces los lectores de otros threads pueden leerlos
+_device_resolved = threading.Event()
+
+
+def load_model():
+    """Resolver dispositivo, acotar threads y crear el modelo (bloqueante)"""
+    # Imports diferidos: torch/CTranslate2 recién cuando se carga el modelo
+    import torch
+    from faster_whisper import WhisperModel
+
+    # Resolver CUDA/CPU aquí y no al importar la configuración
+    try:
+        settings.resolve_device()
+    finally:
+        _device_resolved.set()
+
+    # Acotar los pools de threads de PyTorch: junto a los de
+    # CTranslate2 y el executor sobre-suscriben los cores en CPU
+    # Nunca más threads que cores: la sobre-suscripción dispara la RAM
+    cpu_threads = min(os.cpu_count() or 1, settings.CPU_THREADS)
+    torch.set_num_threads(cpu_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Solo se puede fijar antes del primer trabajo paralelo
+
+    # Crear modelo con configuración optimizada
+    model_kwargs = {
+        "device": settings.DEVICE,
+        "compute_type": settings.COMPUTE_TYPE,
+        # Un solo modelo en memoria; CTranslate2 atiende los jobs
+        # concurrentes con sus propios workers (sin copias del modelo)
+        "num_workers": settings.MAX_CONCURRENT_JOBS,
+        "cpu_threads": cpu_threads
+    }
+
+    if settings.DEVICE == "cuda":
+        model_kwargs["device_index"] = 0
+
+    return WhisperModel(settings.MODEL_SIZE, **model_kwargs)
+
+
+def _run_preload(future: Future) -> None:
+    """Cuerpo del thread de precarga: el resultado (o error) va al future"""
+    try:
+        future.set_result(load_model())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        _device_resolved.set()  # También si falló antes de resolver (import de torch)
+
+
+def wait_device_resolved(timeout: Optional[float] = None) -> bool:
+    """
+    Esperar a que la precarga haya resuelto DEVICE/COMPUTE_TYPE
+
+    Sin precarga iniciada no hay nada que esperar: los settings no cambian.
+    """
+    with _model_lock:
+        started = _model_future is not None
+    return _device_resolved.wait(timeout) if started else True
+
+
+def start_preload() -> Future:
+    """
+    Iniciar la carga del modelo en un thread daemon (idempotente)
+
+    La primera llamada lanza la carga; las siguientes devuelven el mismo
+    future, así el servicio espera la carga ya en curso en vez de repetirla.
+    """
+    global _model_future
+    with _model_lock:
+        if _model_future is None:
+            _model_future = Future()
+            threading.Thread(
+                target=_run_preload,
+                args=(_model_future,),
+                name="model-preload",
+                daemon=True
+            ).start()
+        return _model_future
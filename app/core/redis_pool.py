@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from redis.asyncio import BlockingConnectionPool, ConnectionPool
+
+from app.config import settings
+
+
+def _connection_kwargs(decode_responses: bool) -> dict:
+    """Parámetros de conexión comunes a todos los pools"""
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "db": settings.REDIS_DB,
+        "password": settings.REDIS_PASSWORD,
+        "decode_responses": decode_responses,
+        "socket_connect_timeout": 2,  # Timeout reducido
+        "health_check_interval": 30
+    }
+
+
+@lru_cache(maxsize=2)
+def get_redis_pool(decode_responses: bool = True) -> BlockingConnectionPool:
+    """
+    Pool compartido del proceso (cola, semáforo, ...)
+
+    Uno por modo de decodificación: redis-py decodifica a nivel de
+    conexión, así que clientes binarios y de texto no pueden compartir
+    sockets. Bloqueante: en ráfagas los callers esperan una conexión
+    libre (hasta `timeout`) en vez de fallar con "Too many connections".
+    """
+    return BlockingConnectionPool(
+        **_connection_kwargs(decode_responses),
+        socket_timeout=2,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=2
+    )
+
+
+@lru_cache(maxsize=1)
+def get_blocking_commands_pool() -> ConnectionPool:
+    """
+    Pool para comandos bloqueantes (BLMOVE)
+
+    Sin socket_timeout: el bloqueo lo acota el timeout del propio
+    comando (con el pool compartido cortaría a los 2s).
+    """
+    return ConnectionPool(
+        **_connection_kwargs(True),
+        max_connections=8
+    )
@@ -1,21 +1,146 @@
-import redis
-import json
+import orjson
+import sys
 import time
-import asyncio
-from typing import Dict, List, Optional, Any
-from enum import Enum
+import heapq
+from typing import Dict, Final, List, Optional, Any
+
+from redis.asyncio import Redis
 
 from app.config import settings
+from app.core.redis_pool import get_blocking_commands_pool, get_redis_pool
+from app.utils.cache import TimedCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class JobStatus(str, Enum):
-    PENDING = "pending"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
+# Estados de job como str internados: sin Enum.__call__ ni .value por uso.
+# Los valores leídos de Redis son strings nuevos: comparar con ==, no con is
+PENDING: Final[str] = sys.intern("pending")
+PROCESSING: Final[str] = sys.intern("processing")
+COMPLETED: Final[str] = sys.intern("completed")
+FAILED: Final[str] = sys.intern("failed")
+
+VALID_STATUSES: Final[frozenset] = frozenset({PENDING, PROCESSING, COMPLETED, FAILED})
+
+
+# Marca de valor no-str codificado como JSON en el hash (int, bool,
+# float, dict, list). Un str que empiece con la marca también se codifica,
+# así _decode nunca confunde un string del usuario con un valor JSON
+_JSON_TAG = "\x00"
+_JSON_TAG_BYTES = _JSON_TAG.encode()
+
+# Campos numéricos escritos sin marca (started_at lo fija el Lua de claim)
+_FLOAT_FIELDS = frozenset({
+    "created_at", "started_at", "completed_at",
+    "duration", "processing_time", "speed", "language_probability"
+})
+
+
+# Reclamar el siguiente job en un solo round-trip:
+# LMOVE (si no viene ARGV[5]) + ZREM del índice + marcar processing con TTL
+# KEYS: pending, processing, pending_z
+# ARGV: prefijo de jobs, started_at, TTL, status, job_id ya movido (o "")
+_CLAIM_LUA = """
+local id = ARGV[5]
+if id == "" then
+    id = redis.call("LMOVE", KEYS[1], KEYS[2], "RIGHT", "LEFT")
+    if not id then
+        return false
+    end
+end
+redis.call("ZREM", KEYS[3], id)
+local key = ARGV[1] .. id
+if redis.call("EXISTS", key) == 0 then
+    redis.call("LREM", KEYS[2], 0, id)
+    return {id}
+end
+redis.call("HSET", key, "status", ARGV[4], "started_at", ARGV[2])
+redis.call("EXPIRE", key, ARGV[3])
+return {id, redis.call("HGETALL", key)}
+"""
+
+# Estado de la cola en una sola respuesta
+# KEYS: pending_z, processing, stats
+_STATUS_LUA = """
+local s = redis.call("HMGET", KEYS[3], "completed", "failed", "total", "speed_sum", "speed_count")
+return {
+    redis.call("ZCARD", KEYS[1]),
+    redis.call("LLEN", KEYS[2]),
+    s[1] or "0", s[2] or "0", s[3] or "0", s[4] or "0", s[5] or "0"
+}
+"""
+
+# Actualizar campos solo si el job existe (EXISTS + HSET atómico): un hash
+# que expiró no se recrea parcial y sin TTL
+# KEYS: hash del job; ARGV: campo1, valor1, campo2, valor2, ...
+_UPDATE_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call("HSET", KEYS[1], unpack(ARGV))
+    return 1
+end
+return 0
+"""
+
+# Quitar un job de los sets de trigramas: la lista de trigramas se guarda
+# (JSON, calculada en Python) en un hash aparte que sobrevive al del job
+# unindex(hash id → trigramas, prefijo de los sets, id)
+_UNINDEX_LUA = """
+local function unindex(byjob, prefix, id)
+    local encoded = redis.call("HGET", byjob, id)
+    if encoded then
+        for _, trigram in ipairs(cjson.decode(encoded)) do
+            redis.call("SREM", prefix .. trigram, id)
+        end
+        redis.call("HDEL", byjob, id)
+    end
+end
+"""
+
+# Borrar un job: hash, índices ZSET y entradas en los sets de trigramas
+# KEYS: hash del job, pending_z, completed_z, failed_z, trigramas por job
+# ARGV: job_id, prefijo de los sets de trigramas
+_DELETE_LUA = _UNINDEX_LUA + """
+local deleted = redis.call("DEL", KEYS[1])
+redis.call("ZREM", KEYS[2], ARGV[1])
+redis.call("ZREM", KEYS[3], ARGV[1])
+redis.call("ZREM", KEYS[4], ARGV[1])
+unindex(KEYS[5], ARGV[2], ARGV[1])
+return deleted
+"""
+
+# Limpieza completa en el servidor:
+# - Quita de pending/processing los IDs cuyo hash ya no existe
+# - Recorta los índices de terminados cuyo resultado caducó
+# - Saca a todos esos jobs de los sets de trigramas
+# KEYS: pending, processing, pending_z, completed_z, failed_z, trigramas por job
+# ARGV: prefijo de jobs, corte de completados, corte de fallidos, prefijo de trigramas
+# (arma claves de jobs dentro del script: válido en Redis standalone, no en Cluster)
+_CLEANUP_LUA = _UNINDEX_LUA + """
+local cleaned = 0
+for i = 1, 2 do
+    local ids = redis.call("LRANGE", KEYS[i], 0, -1)
+    for _, id in ipairs(ids) do
+        if redis.call("EXISTS", ARGV[1] .. id) == 0 then
+            if redis.call("LREM", KEYS[i], 0, id) > 0 then
+                cleaned = cleaned + 1
+            end
+            if i == 1 then
+                redis.call("ZREM", KEYS[3], id)
+            end
+            unindex(KEYS[6], ARGV[4], id)
+        end
+    end
+end
+for i = 4, 5 do
+    local cutoff = ARGV[i - 2]
+    for _, id in ipairs(redis.call("ZRANGEBYSCORE", KEYS[i], "-inf", cutoff)) do
+        unindex(KEYS[6], ARGV[4], id)
+    end
+    redis.call("ZREMRANGEBYSCORE", KEYS[i], "-inf", cutoff)
+end
+return cleaned
+"""
 
 
 class OptimizedRedisQueue:
@@ -25,211 +150,469 @@ class OptimizedRedisQueue:
     """
 
     def __init__(self):
-        try:
-            # Configuración Redis optimizada
-            self.redis = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD,
-                decode_responses=True,
-                socket_connect_timeout=2,  # Timeout reducido
-                socket_timeout=2,
-                health_check_interval=30,
-                max_connections=10  # Pool pequeño
-            )
+        # Cliente asíncrono sobre el pool compartido del módulo
+        # (no bloquea el event loop; la conexión se abre en el primer uso)
+        self.redis = Redis(connection_pool=get_redis_pool())
+        self._blocking_redis = Redis(connection_pool=get_blocking_commands_pool())
 
-            # Test de conexión
-            self.redis.ping()
-            logger.info("✅ Redis conectado")
+        # Script registrado: EVALSHA con fallback automático a EVAL
+        self._cleanup_script = self.redis.register_script(_CLEANUP_LUA)
+        self._delete_script = self.redis.register_script(_DELETE_LUA)
+        self._claim_script = self.redis.register_script(_CLAIM_LUA)
+        self._status_script = self.redis.register_script(_STATUS_LUA)
+        self._update_script = self.redis.register_script(_UPDATE_LUA)
 
-        except Exception as e:
-            logger.error(f"❌ Error Redis: {e}")
-            raise ConnectionError(f"Redis no disponible: {e}")
+        # Estado de la cola coalescido: pollers concurrentes comparten un EVALSHA
+        self._status_cache = TimedCache(0.25)
 
         # Claves Redis minimalistas
         self.keys = {
             "pending": "wq:pending",
+            "pending_z": "wq:pending_z",  # Índice de posiciones (score = orden de llegada)
             "processing": "wq:processing",
-            "jobs": "wq:jobs:",  # Prefix para jobs individuales
-            "stats": "wq:stats"
+            "completed_z": "wq:completed_z",  # Terminados por completed_at
+            "failed_z": "wq:failed_z",
+            "jobs": "wq:job:",  # Prefix para el hash de cada job
+            "stats": "wq:stats",
+            "trigram": "wq:idx:filename:",  # Prefix índice de trigramas
+            "trigram_byjob": "wq:idx:filename_byjob"  # job_id → sus trigramas (JSON)
         }
 
+        # Claves precalculadas: los métodos calientes usan atributos
+        # y concatenación en vez de lookup en el dict + f-string
+        self._jobs_prefix = self.keys["jobs"]
+        self._trigram_prefix = self.keys["trigram"]
+        self._k_pending = self.keys["pending"]
+        self._k_pending_z = self.keys["pending_z"]
+        self._k_processing = self.keys["processing"]
+        self._k_completed_z = self.keys["completed_z"]
+        self._k_failed_z = self.keys["failed_z"]
+        self._k_stats = self.keys["stats"]
+        self._k_trigram_byjob = self.keys["trigram_byjob"]
+
+        # KEYS de cada script, en el orden que espera el Lua
+        self._claim_keys = [self._k_pending, self._k_processing, self._k_pending_z]
+        self._status_keys = [self._k_pending_z, self._k_processing, self._k_stats]
+        self._cleanup_keys = [
+            self._k_pending, self._k_processing, self._k_pending_z,
+            self._k_completed_z, self._k_failed_z, self._k_trigram_byjob
+        ]
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        """Trigramas de un texto en minúsculas"""
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def _encode(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Aplanar un dict a campos de hash (None se omite)
+
+        Los str van tal cual; el resto como JSON marcado con _JSON_TAG para
+        que _decode restaure el tipo (int, bool, float, dict, list).
+        """
+        mapping = {}
+        for field, value in data.items():
+            if value is None:
+                continue
+            if not isinstance(value, str) or value.startswith(_JSON_TAG):
+                value = _JSON_TAG_BYTES + orjson.dumps(value)
+            mapping[field] = value
+        return mapping
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Dict[str, Any]:
+        """Hash de Redis a dict, restaurando los tipos codificados por _encode"""
+        for field, value in raw.items():
+            if value.startswith(_JSON_TAG):
+                raw[field] = orjson.loads(value[1:])
+            elif field in _FLOAT_FIELDS:
+                raw[field] = float(value)
+        return raw
+
     async def add_job(self, job_id: str, job_data: Dict[str, Any]) -> int:
         """Agregar trabajo con TTL automático"""
         try:
             # Preparar datos mínimos
             job_data.update({
                 "job_id": job_id,
-                "status": JobStatus.PENDING,
+                "status": PENDING,
                 "created_at": time.time()
             })
 
-            # Pipeline para operaciones atómicas
-            pipe = self.redis.pipeline()
+            # Pipeline sin MULTI/EXEC: solo batching, el orden basta
+            pipe = self.redis.pipeline(transaction=False)
 
-            # Guardar job con TTL
-            job_key = f"{self.keys['jobs']}{job_id}"
-            pipe.setex(job_key, settings.JOB_TTL, json.dumps(job_data))
+            # Guardar job como hash con TTL
+            job_key = self._jobs_prefix + job_id
+            pipe.hset(job_key, mapping=self._encode(job_data))
+            pipe.expire(job_key, settings.JOB_TTL)
 
             # Agregar a cola de pendientes
-            pipe.lpush(self.keys["pending"], job_id)
+            lpush_index = len(pipe)  # LPUSH devuelve el largo de la cola
+            pipe.lpush(self._k_pending, job_id)
+            # Score en segundos float: time_ns (~1.7e18) supera 2^53 y en el
+            # double del ZSET los enqueues cercanos colapsan al mismo score
+            pipe.zadd(self._k_pending_z, {job_id: job_data["created_at"]})
+
+            # Índice de trigramas del filename para búsqueda. La lista queda
+            # guardada por job: delete_job y cleanup_expired hacen SREM de
+            # cada entrada (los sets no acumulan el histórico de jobs)
+            trigrams = self._trigrams(job_data.get("filename") or "")
+            if trigrams:
+                for trigram in trigrams:
+                    pipe.sadd(self._trigram_prefix + trigram, job_id)
+                pipe.hset(self._k_trigram_byjob, job_id, orjson.dumps(sorted(trigrams)))
 
             # Stats mínimos
-            pipe.hincrby(self.keys["stats"], "total", 1)
+            pipe.hincrby(self._k_stats, "total", 1)
 
-            # Ejecutar pipeline
-            pipe.execute()
+            # Ejecutar pipeline; la posición sale del propio LPUSH (sin LLEN extra)
+            results = await pipe.execute()
+            position = results[lpush_index]
 
-            # Posición en cola
-            position = self.redis.llen(self.keys["pending"])
-
-            logger.info(f"📝 Job {job_id} en posición {position}")
+            logger.info("📝 Job %s en posición %s", job_id, position)
             return position
 
         except Exception as e:
-            logger.error(f"❌ Error agregando job {job_id}: {e}")
+            logger.error("❌ Error agregando job %s: %s", job_id, e)
             raise
 
-    async def get_next_job(self) -> Optional[Dict[str, Any]]:
-        """Obtener siguiente trabajo (no bloqueante)"""
+    async def get_next_job(self, timeout: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Obtener siguiente trabajo
+
+        Args:
+            timeout: Segundos a esperar por un job (BLMOVE); 0 = no bloqueante
+        """
         try:
-            # Mover atómicamente a processing
-            job_id = self.redis.rpoplpush(
-                self.keys["pending"],
-                self.keys["processing"]
+            # Con timeout: BLMOVE (no puede ir dentro de Lua) y luego reclamar;
+            # sin timeout: el script hace también el LMOVE (1 round-trip)
+            job_id = ""
+            if timeout > 0:
+                job_id = await self._blocking_redis.blmove(
+                    self._k_pending,
+                    self._k_processing,
+                    timeout,
+                    src="RIGHT",
+                    dest="LEFT"
+                )
+                if not job_id:
+                    return None
+
+            claimed = await self._claim_script(
+                keys=self._claim_keys,
+                args=[
+                    self._jobs_prefix,
+                    repr(time.time()),
+                    settings.JOB_TTL,
+                    PROCESSING,
+                    job_id
+                ]
             )
 
-            if not job_id:
-                return None
-
-            # Obtener datos del job
-            job_key = f"{self.keys['jobs']}{job_id}"
-            job_data_str = self.redis.get(job_key)
-
-            if not job_data_str:
-                # Job expiró, limpiar
-                self.redis.lrem(self.keys["processing"], 0, job_id)
+            # None: cola vacía; [id]: job expirado o borrado (ya limpiado)
+            if not claimed or len(claimed) < 2:
                 return None
 
-            job_data = json.loads(job_data_str)
+            job_id, fields = claimed
+            job_data = self._decode(dict(zip(fields[::2], fields[1::2])))
 
-            # Actualizar estado
-            job_data.update({
-                "status": JobStatus.PROCESSING,
-                "started_at": time.time()
-            })
-
-            # Guardar cambios con TTL extendido
-            self.redis.setex(job_key, settings.JOB_TTL, json.dumps(job_data))
-
-            logger.info(f"🔄 Procesando job {job_id}")
+            logger.info("🔄 Procesando job %s", job_id)
             return job_data
 
         except Exception as e:
-            logger.error(f"❌ Error obteniendo job: {e}")
+            logger.error("❌ Error obteniendo job: %s", e)
             return None
 
     async def complete_job(self, job_id: str, result: Dict[str, Any], success: bool = True):
         """Completar trabajo con TTL para resultado"""
         try:
-            job_key = f"{self.keys['jobs']}{job_id}"
+            job_key = self._jobs_prefix + job_id
 
             # Actualizar estado
+            completed_at = time.time()
             result.update({
-                "status": JobStatus.COMPLETED if success else JobStatus.FAILED,
-                "completed_at": time.time()
+                "status": COMPLETED if success else FAILED,
+                "completed_at": completed_at
             })
 
-            pipe = self.redis.pipeline()
+            pipe = self.redis.pipeline(transaction=False)
 
-            # Guardar resultado con TTL más corto
+            # Guardar resultado (solo campos nuevos) con TTL más corto
             ttl = settings.RESULT_TTL if success else 300  # 5 min para errores
-            pipe.setex(job_key, ttl, json.dumps(result))
+            pipe.hset(job_key, mapping=self._encode(result))
+            pipe.expire(job_key, ttl)
 
             # Remover de processing
-            pipe.lrem(self.keys["processing"], 0, job_id)
+            pipe.lrem(self._k_processing, 0, job_id)
 
-            # Stats
+            # Índice de terminados por fecha (get_recent_jobs)
             stat_key = "completed" if success else "failed"
-            pipe.hincrby(self.keys["stats"], stat_key, 1)
+            finished_key = self._k_completed_z if success else self._k_failed_z
+            pipe.zadd(finished_key, {job_id: completed_at})
+
+            # Stats
+            pipe.hincrby(self._k_stats, stat_key, 1)
+
+            # Agregado de velocidad: promedio O(1) en get_queue_status
+            speed = result.get("speed")
+            if success and speed is not None:
+                pipe.hincrbyfloat(self._k_stats, "speed_sum", speed)
+                pipe.hincrby(self._k_stats, "speed_count", 1)
 
-            pipe.execute()
+            await pipe.execute()
 
             status_msg = "✅ completado" if success else "❌ fallido"
-            logger.info(f"{status_msg}: {job_id}")
+            logger.info("%s: %s", status_msg, job_id)
 
         except Exception as e:
-            logger.error(f"❌ Error completando job {job_id}: {e}")
+            logger.error("❌ Error completando job %s: %s", job_id, e)
 
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Obtener datos de trabajo"""
         try:
-            job_key = f"{self.keys['jobs']}{job_id}"
-            job_data_str = self.redis.get(job_key)
+            raw = await self.redis.hgetall(self._jobs_prefix + job_id)
+            return self._decode(raw) if raw else None
 
-            if job_data_str:
-                return json.loads(job_data_str)
+        except Exception as e:
+            logger.error("❌ Error obteniendo job %s: %s", job_id, e)
             return None
 
+    async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Solo los campos de estado de un trabajo (HMGET, para polling)
+
+        Evita traer el texto transcrito completo en cada consulta de estado.
+        """
+        try:
+            fields = ("status", "created_at", "started_at", "completed_at")
+            values = await self.redis.hmget(self._jobs_prefix + job_id, fields)
+            if values[0] is None:
+                return None
+            return self._decode({
+                field: value for field, value in zip(fields, values) if value is not None
+            })
+
         except Exception as e:
-            logger.error(f"❌ Error obteniendo job {job_id}: {e}")
+            logger.error("❌ Error obteniendo estado del job %s: %s", job_id, e)
             return None
 
-    async def get_queue_status(self) -> Dict[str, Any]:
-        """Estado rápido de la cola"""
+    async def update_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Actualizar campos de un trabajo sin leerlo antes
+
+        HSET toca solo los campos indicados (sin read-modify-write); el
+        chequeo de existencia va en el mismo script (un round-trip)
+        """
         try:
-            pipe = self.redis.pipeline()
+            mapping = self._encode(updates)
+            if not mapping:
+                return False
+            args = [item for pair in mapping.items() for item in pair]
+            updated = await self._update_script(keys=[self._jobs_prefix + job_id], args=args)
+            return updated == 1
 
-            # Conteos básicos
-            pipe.llen(self.keys["pending"])
-            pipe.llen(self.keys["processing"])
-            pipe.hgetall(self.keys["stats"])
+        except Exception as e:
+            logger.error("❌ Error actualizando job %s: %s", job_id, e)
+            return False
 
-            results = pipe.execute()
+    async def delete_job(self, job_id: str) -> bool:
+        """
+        Eliminar un trabajo (borrado lazy)
 
-            pending = results[0]
-            processing = results[1]
-            stats = results[2]
+        El hash del job es la fuente de verdad: se borra junto con sus
+        entradas en los índices ZSET (O(log n)) y en los sets de trigramas,
+        en un solo script. El ID que quede en la lista de pendientes se
+        descarta al salir (get_next_job) o en cleanup_expired, sin LREM
+        O(n) aquí.
+        """
+        try:
+            deleted = await self._delete_script(
+                keys=[
+                    self._jobs_prefix + job_id, self._k_pending_z,
+                    self._k_completed_z, self._k_failed_z, self._k_trigram_byjob
+                ],
+                args=[job_id, self._trigram_prefix]
+            )
+            return deleted == 1
+
+        except Exception as e:
+            logger.error("❌ Error eliminando job %s: %s", job_id, e)
+            return False
+
+    async def _get_jobs(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Hashes de varios jobs en un solo round-trip (None si expiró)"""
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self._jobs_prefix + job_id)
+        return [self._decode(raw) if raw else None for raw in await pipe.execute()]
+
+    async def get_pending_jobs(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Página de trabajos pendientes en orden de ejecución
+
+        La paginación se resuelve en Redis con LRANGE: solo se leen
+        los `limit` IDs pedidos, no toda la cola.
+
+        Args:
+            offset: Trabajos a saltar desde el próximo en ejecutarse
+            limit: Máximo de trabajos a devolver
+        """
+        try:
+            if limit <= 0 or offset < 0:
+                return []
+
+            # LPUSH deja el más antiguo al final: indexar desde la cola
+            job_ids = await self.redis.lrange(
+                self._k_pending,
+                -(offset + limit),
+                -(offset + 1)
+            )
+            if not job_ids:
+                return []
+            job_ids.reverse()
+
+            # Datos de todos los jobs en un solo round-trip
+            return [job for job in await self._get_jobs(job_ids) if job]
+
+        except Exception as e:
+            logger.error("❌ Error listando pendientes: %s", e)
+            return []
+
+    async def count_pending_jobs(self) -> int:
+        """Total de trabajos pendientes (ZCARD, O(1); excluye borrados)"""
+        try:
+            return await self.redis.zcard(self._k_pending_z)
+        except Exception as e:
+            logger.error("❌ Error contando pendientes: %s", e)
+            return 0
+
+    async def search_jobs(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Buscar trabajos por substring del filename
+
+        Intersecta en Redis los sets de trigramas de la consulta y solo
+        descarga los jobs candidatos (consultas de 3+ caracteres).
+        """
+        try:
+            query = query.lower()
+            trigrams = self._trigrams(query)
+            if not trigrams:
+                return []
+
+            job_ids = await self.redis.sinter(
+                [self._trigram_prefix + trigram for trigram in trigrams]
+            )
+            if not job_ids:
+                return []
+
+            results = []
+            for job_data in await self._get_jobs(list(job_ids)):
+                if not job_data:
+                    continue  # Job expirado: cleanup_expired lo saca del índice
+                # Los trigramas pueden dar falsos positivos: confirmar
+                if query in (job_data.get("filename") or "").lower():
+                    results.append(job_data)
+
+            results.sort(key=lambda job: job.get("created_at", 0), reverse=True)
+            return results[:limit]
+
+        except Exception as e:
+            logger.error("❌ Error buscando jobs: %s", e)
+            return []
+
+    async def get_recent_jobs(self, max_age_seconds: int = 3600, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Trabajos terminados recientemente (completados y fallidos), más nuevos primero
+
+        ZREVRANGEBYSCORE acota por fecha en Redis; solo se descargan
+        los `limit` jobs que se devuelven.
+
+        Args:
+            max_age_seconds: Antigüedad máxima de `completed_at`
+            limit: Máximo de trabajos a devolver
+        """
+        try:
+            if limit <= 0:
+                return []
+
+            cutoff = time.time() - max_age_seconds
+
+            pipe = self.redis.pipeline(transaction=False)
+            for key in (self._k_completed_z, self._k_failed_z):
+                pipe.zrevrangebyscore(
+                    key, "+inf", cutoff,
+                    start=0, num=limit, withscores=True
+                )
+            completed, failed = await pipe.execute()
+
+            # Ambas listas ya vienen ordenadas: merge O(n) en vez de sort
+            merged = heapq.merge(completed, failed, key=lambda item: item[1], reverse=True)
+            job_ids = [job_id for job_id, _ in merged][:limit]
+            if not job_ids:
+                return []
+
+            return [job for job in await self._get_jobs(job_ids) if job]
+
+        except Exception as e:
+            logger.error("❌ Error listando recientes: %s", e)
+            return []
+
+    async def get_queue_status(self) -> Dict[str, Any]:
+        """Estado rápido de la cola (caché coalescido de 250ms)"""
+        return await self._status_cache.get_or_refresh(self._fetch_queue_status)
+
+    async def _fetch_queue_status(self) -> Dict[str, Any]:
+        """Leer estado de la cola de Redis"""
+        try:
+            # Conteos y stats en un único comando (pendientes por el índice:
+            # excluye borrados lazy)
+            pending, processing, completed, failed, total, speed_sum, speed_count = (
+                await self._status_script(keys=self._status_keys)
+            )
+
+            speed_count = int(speed_count)
+            average_speed = float(speed_sum) / speed_count if speed_count else 0.0
 
             return {
                 "pending": pending,
                 "processing": processing,
-                "completed": int(stats.get("completed", 0)),
-                "failed": int(stats.get("failed", 0)),
-                "total": int(stats.get("total", 0)),
+                "completed": int(completed),
+                "failed": int(failed),
+                "total": int(total),
+                "average_speed": round(average_speed, 2),
                 "can_accept": processing < settings.MAX_CONCURRENT_JOBS
             }
 
         except Exception as e:
-            logger.error(f"❌ Error stats: {e}")
+            logger.error("❌ Error stats: %s", e)
             return {
                 "pending": 0,
                 "processing": 0,
                 "completed": 0,
                 "failed": 0,
                 "total": 0,
+                "average_speed": 0.0,
                 "can_accept": False
             }
 
     async def get_job_position(self, job_id: str) -> Optional[int]:
-        """Posición en cola de forma eficiente"""
+        """Posición en cola (ZRANK sobre el índice, O(log n))"""
         try:
-            # Obtener lista de pendientes
-            pending_jobs = self.redis.lrange(self.keys["pending"], 0, -1)
-
-            if job_id in pending_jobs:
-                return len(pending_jobs) - pending_jobs.index(job_id)
-            return None
+            # Rank 0 = el más antiguo = próximo en ejecutarse
+            rank = await self.redis.zrank(self._k_pending_z, job_id)
+            return rank + 1 if rank is not None else None
 
         except Exception as e:
-            logger.error(f"❌ Error posición job {job_id}: {e}")
+            logger.error("❌ Error posición job %s: %s", job_id, e)
             return None
 
     async def health_check(self) -> bool:
         """Health check rápido"""
         try:
-            self.redis.ping()
+            await self.redis.ping()
             return True
         except:
             return False
@@ -237,40 +620,34 @@ class OptimizedRedisQueue:
     async def cleanup_expired(self) -> int:
         """Limpiar trabajos expirados de las colas"""
         try:
-            cleaned = 0
-
-            # Limpiar pending jobs expirados
-            pending_jobs = self.redis.lrange(self.keys["pending"], 0, -1)
-            for job_id in pending_jobs:
-                job_key = f"{self.keys['jobs']}{job_id}"
-                if not self.redis.exists(job_key):
-                    self.redis.lrem(self.keys["pending"], 0, job_id)
-                    cleaned += 1
-
-            # Limpiar processing jobs expirados
-            processing_jobs = self.redis.lrange(self.keys["processing"], 0, -1)
-            for job_id in processing_jobs:
-                job_key = f"{self.keys['jobs']}{job_id}"
-                if not self.redis.exists(job_key):
-                    self.redis.lrem(self.keys["processing"], 0, job_id)
-                    cleaned += 1
+            # Escaneo + borrado server-side en un único round-trip
+            now = time.time()
+            cleaned = await self._cleanup_script(
+                keys=self._cleanup_keys,
+                args=[
+                    self._jobs_prefix,
+                    now - settings.RESULT_TTL,
+                    now - 300,  # TTL de resultados fallidos
+                    self._trigram_prefix
+                ]
+            )
 
             if cleaned > 0:
-                logger.info(f"🧹 Limpiados {cleaned} jobs expirados")
+                logger.info("🧹 Limpiados %d jobs expirados", cleaned)
 
             return cleaned
 
         except Exception as e:
-            logger.error(f"❌ Error cleanup: {e}")
+            logger.error("❌ Error cleanup: %s", e)
             return 0
 
     async def reset_stats(self):
         """Reset stats (para maintenance)"""
         try:
-            self.redis.delete(self.keys["stats"])
+            await self.redis.delete(self._k_stats)
             logger.info("📊 Stats reseteadas")
         except Exception as e:
-            logger.error(f"❌ Error reset stats: {e}")
+            logger.error("❌ Error reset stats: %s", e)
 
 
 # Instancia global
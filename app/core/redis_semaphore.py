@@ -1,13 +1,40 @@
-import redis
-import json
+import msgpack
+import orjson
 import time
-import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from redis.asyncio import Redis
+
 from app.config import settings
+from app.core.redis_pool import get_redis_pool
+from app.utils.cache import TimedCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Serialización del estado del job (REDIS_SERIALIZER)
+if settings.REDIS_SERIALIZER == "json":
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    _dumps = msgpack.packb
+
+    def _loads(data: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(data, raw=False)
+
+
+# Liberar el lock solo si es del job (GET + DEL atómico)
+# KEYS: lock, status - ARGV: job_id
+_RELEASE_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("DEL", KEYS[2])
+    return 1
+else
+    return 0
+end
+"""
+
 
 class ProcessingSemaphore:
     """
@@ -16,27 +43,13 @@ class ProcessingSemaphore:
     """
 
     def __init__(self):
-        try:
-            # Conexión Redis optimizada
-            self.redis = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD,
-                decode_responses=True,
-                socket_connect_timeout=2,
-                socket_timeout=2,
-                health_check_interval=30,
-                max_connections=5
-            )
+        # Cliente asíncrono (no bloquea el event loop) sobre el pool binario
+        # compartido: el estado puede ser msgpack. La conexión se abre en el
+        # primer uso y se verifica en el startup de la app (health_check)
+        self.redis = Redis(connection_pool=get_redis_pool(decode_responses=False))
 
-            # Test conexión
-            self.redis.ping()
-            logger.info("✅ Redis semáforo conectado")
-
-        except Exception as e:
-            logger.error(f"❌ Error Redis semáforo: {e}")
-            raise ConnectionError(f"Redis no disponible: {e}")
+        # Script registrado: EVALSHA con fallback automático a EVAL
+        self._release_script = self.redis.register_script(_RELEASE_LUA)
 
         # Claves Redis para el semáforo
         self.keys = {
@@ -48,6 +61,16 @@ class ProcessingSemaphore:
         # TTL para auto-limpieza en caso de crash
         self.lock_ttl = 3600  # 1 hora máximo
 
+        # INFO es pesado: cachear los campos de conexión unos segundos
+        self._connection_info_cache = TimedCache(5.0)
+
+        # Estado actual coalescido: ráfagas de polling comparten un MGET.
+        # Guarda una tupla (estado,) porque None es un estado válido (idle)
+        self._status_cache = TimedCache(0.25)
+
+        # EXISTS + TTL del lock coalescidos (is_processing / get_lock_ttl)
+        self._lock_cache = TimedCache(0.2)
+
     async def acquire_lock(self, job_id: str, job_info: Dict[str, Any]) -> bool:
         """
         Intentar adquirir el lock de procesamiento
@@ -58,7 +81,7 @@ class ProcessingSemaphore:
         """
         try:
             # Usar SET con NX (solo si no existe) y EX (con TTL)
-            lock_acquired = self.redis.set(
+            lock_acquired = await self.redis.set(
                 self.keys["lock"],
                 job_id,
                 nx=True,  # Solo si no existe
@@ -76,20 +99,22 @@ class ProcessingSemaphore:
                 }
 
                 # Guardar estado con TTL
-                self.redis.setex(
+                await self.redis.setex(
                     self.keys["status"],
                     self.lock_ttl,
-                    json.dumps(job_data)
+                    _dumps(job_data)
                 )
 
-                logger.info(f"🔒 Lock adquirido para job {job_id}")
+                self._status_cache.invalidate()
+                self._lock_cache.invalidate()
+                logger.info("🔒 Lock adquirido para job %s", job_id)
                 return True
             else:
-                logger.info(f"⏳ Lock no disponible para job {job_id}")
+                logger.info("⏳ Lock no disponible para job %s", job_id)
                 return False
 
         except Exception as e:
-            logger.error(f"❌ Error adquiriendo lock: {e}")
+            logger.error("❌ Error adquiriendo lock: %s", e)
             return False
 
     async def release_lock(self, job_id: str) -> bool:
@@ -105,34 +130,52 @@ class ProcessingSemaphore:
         """
         try:
             # Verificar que el lock es nuestro usando script Lua (atómico)
-            lua_script = """
-            if redis.call("GET", KEYS[1]) == ARGV[1] then
-                redis.call("DEL", KEYS[1])
-                redis.call("DEL", KEYS[2])
-                return 1
-            else
-                return 0
-            end
-            """
-
-            result = self.redis.eval(
-                lua_script,
-                2,  # Número de keys
-                self.keys["lock"], self.keys["status"],  # KEYS[1], KEYS[2]
-                job_id  # ARGV[1]
+            result = await self._release_script(
+                keys=[self.keys["lock"], self.keys["status"]],
+                args=[job_id]
             )
 
             if result == 1:
-                logger.info(f"🔓 Lock liberado para job {job_id}")
+                self._status_cache.invalidate()
+                self._lock_cache.invalidate()
+                logger.info("🔓 Lock liberado para job %s", job_id)
                 return True
             else:
-                logger.warning(f"⚠️ No se pudo liberar lock para job {job_id} (no era propietario)")
+                logger.warning("⚠️ No se pudo liberar lock para job %s (no era propietario)", job_id)
                 return False
 
         except Exception as e:
-            logger.error(f"❌ Error liberando lock: {e}")
+            logger.error("❌ Error liberando lock: %s", e)
             return False
 
+    def _build_status(self, current_lock: Optional[bytes], status_data: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """Armar el estado a partir del lock y el estado serializado crudos"""
+        if not current_lock:
+            return None
+
+        if status_data:
+            job_data = _loads(status_data)
+
+            # Calcular tiempo transcurrido
+            elapsed = time.time() - job_data.get("start_time", time.time())
+            job_data["elapsed_seconds"] = round(elapsed, 1)
+
+            # Estimar tiempo restante basado en tamaño del archivo
+            file_size_mb = job_data.get("file_size", 0) / (1024 * 1024)
+            estimated_total = max(30, file_size_mb * 2)  # ~2s por MB
+            remaining = max(5, estimated_total - elapsed)
+            job_data["estimated_remaining_seconds"] = round(remaining, 1)
+
+            return job_data
+        else:
+            # Solo tenemos lock pero no estado detallado
+            return {
+                "job_id": current_lock.decode(),
+                "status": "processing",
+                "elapsed_seconds": 0,
+                "estimated_remaining_seconds": 30
+            }
+
     async def get_current_status(self) -> Optional[Dict[str, Any]]:
         """
         Obtener estado actual del procesamiento
@@ -140,42 +183,66 @@ class ProcessingSemaphore:
         Returns:
             Dict con estado actual o None si no hay procesamiento
         """
-        try:
-            # Verificar si hay lock activo
-            current_lock = self.redis.get(self.keys["lock"])
+        cached = await self._status_cache.get_or_refresh(self._fetch_current_status)
+        return cached[0]
 
-            if not current_lock:
-                return None
+    async def _fetch_current_status(self) -> tuple:
+        """Leer estado de Redis (envuelto en tupla para el caché)"""
+        try:
+            # Lock y estado detallado en un solo round-trip
+            current_lock, status_data = await self.redis.mget(
+                self.keys["lock"], self.keys["status"]
+            )
+            return (self._build_status(current_lock, status_data),)
 
-            # Obtener estado detallado
-            status_data = self.redis.get(self.keys["status"])
+        except Exception as e:
+            logger.error("❌ Error obteniendo estado: %s", e)
+            return (None,)
 
-            if status_data:
-                job_data = json.loads(status_data)
+    async def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Lock, estado y salud de Redis en un único round-trip
 
-                # Calcular tiempo transcurrido
-                elapsed = time.time() - job_data.get("start_time", time.time())
-                job_data["elapsed_seconds"] = round(elapsed, 1)
+        Returns:
+            Dict con redis_ok, is_processing y current_status
+        """
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(self.keys["lock"])
+            pipe.get(self.keys["status"])
+            pipe.ping()
+            current_lock, status_data, _ = await pipe.execute()
+
+            return {
+                "redis_ok": True,
+                "is_processing": current_lock is not None,
+                "current_status": self._build_status(current_lock, status_data)
+            }
 
-                # Estimar tiempo restante basado en tamaño del archivo
-                file_size_mb = job_data.get("file_size", 0) / (1024 * 1024)
-                estimated_total = max(30, file_size_mb * 2)  # ~2s por MB
-                remaining = max(5, estimated_total - elapsed)
-                job_data["estimated_remaining_seconds"] = round(remaining, 1)
+        except Exception as e:
+            logger.error("❌ Error obteniendo snapshot: %s", e)
+            return {
+                "redis_ok": False,
+                "is_processing": False,  # Asumir disponible en caso de error
+                "current_status": None
+            }
+
+    async def get_lock_snapshot(self) -> Tuple[bool, int]:
+        """
+        Existencia y TTL del lock en un round-trip (caché coalescido de 200ms)
 
-                return job_data
-            else:
-                # Solo tenemos lock pero no estado detallado
-                return {
-                    "job_id": current_lock,
-                    "status": "processing",
-                    "elapsed_seconds": 0,
-                    "estimated_remaining_seconds": 30
-                }
+        Returns:
+            (lock existe, TTL en segundos; negativo si no hay lock)
+        """
+        return await self._lock_cache.get_or_refresh(self._fetch_lock_snapshot)
 
-        except Exception as e:
-            logger.error(f"❌ Error obteniendo estado: {e}")
-            return None
+    async def _fetch_lock_snapshot(self) -> Tuple[bool, int]:
+        """Leer EXISTS + TTL del lock en un pipeline"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.exists(self.keys["lock"])
+        pipe.ttl(self.keys["lock"])
+        exists, ttl = await pipe.execute()
+        return exists == 1, ttl
 
     async def is_processing(self) -> bool:
         """
@@ -186,9 +253,10 @@ class ProcessingSemaphore:
             False: Sistema disponible
         """
         try:
-            return self.redis.exists(self.keys["lock"]) == 1
+            exists, _ = await self.get_lock_snapshot()
+            return exists
         except Exception as e:
-            logger.error(f"❌ Error verificando estado: {e}")
+            logger.error("❌ Error verificando estado: %s", e)
             return False  # Asumir disponible en caso de error
 
     async def force_release(self) -> bool:
@@ -200,17 +268,17 @@ class ProcessingSemaphore:
             False: Error
         """
         try:
-            # Eliminar todas las claves relacionadas
-            pipe = self.redis.pipeline()
-            pipe.delete(self.keys["lock"])
-            pipe.delete(self.keys["status"])
-            pipe.execute()
+            # Eliminar todas las claves relacionadas (UNLINK: liberación en
+            # background en Redis, un solo comando)
+            await self.redis.unlink(self.keys["lock"], self.keys["status"])
 
+            self._status_cache.invalidate()
+            self._lock_cache.invalidate()
             logger.info("🚨 Lock forzadamente liberado")
             return True
 
         except Exception as e:
-            logger.error(f"❌ Error forzando liberación: {e}")
+            logger.error("❌ Error forzando liberación: %s", e)
             return False
 
     async def health_check(self) -> bool:
@@ -222,11 +290,41 @@ class ProcessingSemaphore:
             False: Problemas de conexión
         """
         try:
-            self.redis.ping()
+            await self.redis.ping()
             return True
         except Exception:
             return False
 
+    async def get_connection_info(self) -> Dict[str, Any]:
+        """
+        Datos de conexión del servidor Redis (caché de 5s)
+
+        Solo pide las secciones necesarias de INFO en vez del volcado
+        completo; para liveness usar health_check (PING).
+        """
+        info = self._connection_info_cache.get()
+        if info is not None:
+            return info
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.info("server")
+            pipe.info("clients")
+            pipe.info("memory")
+            server, clients, memory = await pipe.execute()
+
+            return self._connection_info_cache.set({
+                "redis_version": server.get("redis_version"),
+                "uptime_seconds": server.get("uptime_in_seconds"),
+                "connected_clients": clients.get("connected_clients"),
+                "blocked_clients": clients.get("blocked_clients"),
+                "used_memory_mb": round(memory.get("used_memory", 0) / (1024 * 1024), 1)
+            })
+
+        except Exception as e:
+            logger.error("❌ Error obteniendo info de Redis: %s", e)
+            return {"error": str(e)}
+
     async def get_lock_ttl(self) -> Optional[int]:
         """
         Obtener TTL restante del lock actual
@@ -235,10 +333,10 @@ class ProcessingSemaphore:
             Segundos restantes del lock o None si no hay lock
         """
         try:
-            ttl = self.redis.ttl(self.keys["lock"])
+            _, ttl = await self.get_lock_snapshot()
             return ttl if ttl > 0 else None
         except Exception as e:
-            logger.error(f"❌ Error obteniendo TTL: {e}")
+            logger.error("❌ Error obteniendo TTL: %s", e)
             return None
 
     async def cleanup_expired(self) -> bool:
@@ -247,15 +345,15 @@ class ProcessingSemaphore:
         """
         try:
             # Redis ya maneja TTL automáticamente, pero podemos verificar
-            if not await self.is_processing():
+            # (lectura directa: antes de borrar no vale un snapshot cacheado)
+            exists, _ = await self._fetch_lock_snapshot()
+            if not exists:
                 # No hay procesamiento, limpiar cualquier estado residual
-                pipe = self.redis.pipeline()
-                pipe.delete(self.keys["status"])
-                pipe.execute()
+                await self.redis.unlink(self.keys["status"])
                 return True
             return False
         except Exception as e:
-            logger.error(f"❌ Error cleanup: {e}")
+            logger.error("❌ Error cleanup: %s", e)
             return False
 
 
@@ -3,17 +3,90 @@ import torch
 import asyncio
 import threading
 import gc
+import logging
+import numpy as np
 import psutil
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Dict, Any, BinaryIO, Union
 from faster_whisper import WhisperModel
+from faster_whisper.tokenizer import _LANGUAGE_CODES
+from faster_whisper.vad import VadOptions
 from contextlib import asynccontextmanager
 
 from app.config import settings
+from app.core import model_loader
+from app.utils.cache import TimedCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+_MB = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """Disponibilidad de CUDA (no cambia durante la vida del proceso)"""
+    return torch.cuda.is_available()
+
+
+@lru_cache(maxsize=1)
+def _gpu_static_info() -> Dict[str, Any]:
+    """Propiedades fijas de la GPU (una sola consulta al driver por proceso)"""
+    return {
+        "device_count": torch.cuda.device_count(),
+        "device_name": torch.cuda.get_device_name(0),
+        "memory_total_mb": torch.cuda.get_device_properties(0).total_memory / _MB
+    }
+
+
+# Silero VAD integrado en faster-whisper: recorta los silencios del audio
+# decodificado antes del encoder (menos FLOPs y sin alucinaciones en silencio)
+_VAD_OPTIONS = VadOptions(
+    threshold=settings.VAD_THRESHOLD,
+    min_silence_duration_ms=settings.VAD_MIN_SILENCE_MS
+)
+
+# Opciones de transcribe() armadas una vez al importar (solo lectura)
+_TRANSCRIBE_OPTIONS = MappingProxyType({
+    "beam_size": settings.BEAM_SIZE,
+    "temperature": settings.TEMPERATURE,
+    "vad_filter": settings.VAD_FILTER,
+    "vad_parameters": _VAD_OPTIONS,
+    "chunk_length": settings.CHUNK_LENGTH,
+    "condition_on_previous_text": settings.CONDITION_ON_PREVIOUS_TEXT
+})
+
+
+# Códigos de idioma que acepta Whisper: se validan antes de subir el
+# archivo al lock/GPU (un código inválido es error del cliente, no 500)
+SUPPORTED_LANGUAGES = frozenset(_LANGUAGE_CODES)
+
+
+def normalize_language(language: Optional[str]) -> Optional[str]:
+    """
+    Código de idioma normalizado (None si viene vacío)
+
+    Raises:
+        ValueError: si Whisper no soporta el código
+    """
+    if language is None:
+        return None
+    code = language.strip().lower()
+    if not code:
+        return None
+    if code not in SUPPORTED_LANGUAGES:
+        raise ValueError(f"Idioma no soportado: {language!r} (usar código ISO, ej. 'es', 'en')")
+    return code
+
+
+# DEFAULT_LANGUAGE validado al arrancar: un .env mal configurado falla al
+# importar el servicio y no en cada transcripción
+_DEFAULT_LANGUAGE = normalize_language(settings.DEFAULT_LANGUAGE)
+
+
 class AlwaysLoadedWhisperService:
     """
     Servicio Whisper con modelo SIEMPRE cargado
@@ -22,18 +95,41 @@ class AlwaysLoadedWhisperService:
 
     def __init__(self):
         self._model: Optional[WhisperModel] = None
-        self._model_lock = asyncio.Lock()
+        # Contador de jobs: solo se toca desde el event loop y sin await
+        # entre chequeo e incremento, así que no necesita lock
         self._current_jobs = 0
         self._max_concurrent = settings.MAX_CONCURRENT_JOBS
         self._model_loaded_at = None
         self._total_transcriptions = 0
 
+        # Pool propio para inferencia: acotado a los jobs concurrentes para
+        # no competir con el executor por defecto (I/O, limpieza).
+        # Acotado = backpressure natural sobre el trabajo en GPU
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrent,
+            thread_name_prefix="whisper"
+        )
+
+        # Consultas de memoria GPU/RAM coalescidas (sync point de CUDA)
+        self._memory_info_cache = TimedCache(0.2)
+
+        # RAM/VRAM muestreadas en background (fuera del request path)
+        self._process = psutil.Process()
+        self._ram_usage_mb = 0.0
+        self._gpu_memory_mb = 0.0
+
         # Inicializar modelo inmediatamente
         asyncio.create_task(self._initialize_model_on_startup())
 
         # Background maintenance (sin descarga de modelo)
         asyncio.create_task(self._background_maintenance())
 
+        # Muestreo periódico de recursos del sistema
+        asyncio.create_task(self._system_sampler())
+
+        # Devolver caché CUDA ociosa solo cuando crece (nunca por request)
+        asyncio.create_task(self._gpu_cache_trim_loop())
+
     async def _initialize_model_on_startup(self):
         """Cargar modelo inmediatamente al iniciar"""
         logger.info("🚀 Inicializando modelo Whisper (always-loaded mode)...")
@@ -42,43 +138,51 @@ class AlwaysLoadedWhisperService:
             # Limpiar memoria antes de cargar
             await self._aggressive_cleanup()
 
-            # Crear modelo con configuración optimizada
-            model_kwargs = {
-                "device": settings.DEVICE,
-                "compute_type": settings.COMPUTE_TYPE,
-                "num_workers": 1,  # Mínimo para estabilidad
-                "cpu_threads": settings.CPU_THREADS
-            }
-
-            if settings.DEVICE == "cuda":
-                model_kwargs["device_index"] = 0
-
-            # Cargar en thread separado
+            # Resolución de dispositivo (init de CUDA) y carga de pesos en un
+            # thread: el event loop sigue atendiendo /health durante el arranque.
+            # Si run.py ya disparó la precarga, se espera esa misma carga
             loop = asyncio.get_event_loop()
-            self._model = await loop.run_in_executor(
-                None,
-                lambda: WhisperModel(settings.MODEL_SIZE, **model_kwargs)
-            )
+            self._model = await asyncio.wrap_future(model_loader.start_preload())
 
             self._model_loaded_at = time.time()
 
             # Test rápido para verificar funcionamiento
-            logger.info(f"✅ Modelo {settings.MODEL_SIZE} cargado y listo")
+            logger.info("✅ Modelo %s cargado y listo", settings.MODEL_SIZE)
 
             # Log de memoria
-            if torch.cuda.is_available():
-                memory_mb = torch.cuda.memory_allocated() / (1024**2)
-                logger.info(f"💾 VRAM ocupada: {memory_mb:.1f}MB")
+            if _cuda_available():
+                memory_mb = torch.cuda.memory_allocated() / _MB
+                logger.info("💾 VRAM ocupada: %.1fMB", memory_mb)
 
-            # Test dummy para verificar que funciona
-            logger.info("🧪 Ejecutando test de verificación...")
-            # El test se hará con el primer audio real
+            # Warm-up: la compilación de kernels CUDA y los handles de cuBLAS
+            # se pagan en el arranque y no en el primer request real
+            logger.info("🧪 Calentando modelo...")
+            try:
+                warmup_time = await loop.run_in_executor(None, self._warm_up_sync, self._model)
+                logger.info("🔥 Modelo calentado en %.2fs", warmup_time)
+            except Exception as e:
+                # No fatal: el primer request real paga la compilación
+                logger.warning("⚠️ Warm-up fallido: %s", e)
 
         except Exception as e:
-            logger.error(f"❌ Error cargando modelo: {e}")
+            logger.error("❌ Error cargando modelo: %s", e)
             self._model = None
             raise
 
+    @staticmethod
+    def _warm_up_sync(model: WhisperModel) -> float:
+        """Transcribir 1s de silencio de punta a punta (encoder + decoder)"""
+        start = time.perf_counter()
+        segments, _ = model.transcribe(
+            np.zeros(16000, dtype=np.float32),
+            beam_size=1,
+            vad_filter=False,
+            without_timestamps=True
+        )
+        for _ in segments:
+            pass
+        return time.perf_counter() - start
+
     async def _background_maintenance(self):
         """Mantenimiento background SIN descarga de modelo"""
         while True:
@@ -95,7 +199,38 @@ class AlwaysLoadedWhisperService:
                     await self._log_status()
 
             except Exception as e:
-                logger.error(f"❌ Error en maintenance: {e}")
+                logger.error("❌ Error en maintenance: %s", e)
+
+    async def _system_sampler(self):
+        """Refrescar snapshot de RAM/VRAM cada 2s (los endpoints solo lo leen)"""
+        while True:
+            try:
+                self._ram_usage_mb = self._process.memory_info().rss / _MB
+            except Exception:
+                self._ram_usage_mb = 0.0
+            if _cuda_available():
+                self._gpu_memory_mb = torch.cuda.memory_allocated() / _MB
+            await asyncio.sleep(2)
+
+    async def _gpu_cache_trim_loop(self):
+        """
+        Cada 5 min, liberar bloques cacheados por el allocator CUDA si la
+        reserva ociosa supera 512MB y no hay trabajos en curso
+
+        empty_cache sincroniza el stream: fuera del camino de cada request
+        """
+        if not _cuda_available():
+            return
+
+        while True:
+            await asyncio.sleep(300)
+            try:
+                idle_bytes = torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+                if self._current_jobs == 0 and idle_bytes > 512 * _MB:
+                    torch.cuda.empty_cache()
+                    logger.debug("🧹 Caché CUDA liberada: %.0fMB", idle_bytes / _MB)
+            except Exception as e:
+                logger.error("❌ Error liberando caché CUDA: %s", e)
 
     async def _memory_cleanup_without_model(self):
         """Limpieza de memoria conservando el modelo"""
@@ -104,53 +239,51 @@ class AlwaysLoadedWhisperService:
             collected = gc.collect()
 
             # GPU cleanup suave
-            if torch.cuda.is_available():
+            if _cuda_available():
                 # NO hacer empty_cache agresivo que podría afectar el modelo
                 pass
 
             if collected > 0:
-                logger.debug(f"🧹 Maintenance: {collected} objetos limpiados (modelo preservado)")
+                logger.debug("🧹 Maintenance: %d objetos limpiados (modelo preservado)", collected)
 
         except Exception as e:
-            logger.error(f"❌ Error en cleanup: {e}")
+            logger.error("❌ Error en cleanup: %s", e)
 
     async def _aggressive_cleanup(self):
         """Limpieza agresiva (solo durante carga inicial)"""
         try:
             collected = gc.collect()
 
-            if torch.cuda.is_available():
+            if _cuda_available():
                 torch.cuda.empty_cache()
                 torch.cuda.synchronize()
 
-            # GC agresivo solo durante startup
-            if settings.AGGRESSIVE_CLEANUP:
-                gc.set_threshold(0)
-                for _ in range(3):
-                    collected += gc.collect()
-                gc.set_threshold(700, 10, 10)
-
             if collected > 0:
-                logger.debug(f"🧹 Cleanup agresivo: {collected} objetos")
+                logger.debug("🧹 Cleanup agresivo: %d objetos", collected)
 
         except Exception as e:
-            logger.error(f"❌ Error en cleanup agresivo: {e}")
+            logger.error("❌ Error en cleanup agresivo: %s", e)
 
     async def _log_status(self):
         """Log periódico de estado"""
+        # Con INFO filtrado no se consulta memoria ni se arma el mensaje
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
         try:
-            status = await self.get_status()
+            memory_info = self._get_memory_info()
             uptime = time.time() - self._model_loaded_at if self._model_loaded_at else 0
 
             logger.info(
-                f"📊 Estado: Modelo cargado {uptime/3600:.1f}h, "
-                f"RAM {status['memory_info'].get('ram_usage_mb', 0):.1f}MB, "
-                f"VRAM {status['memory_info'].get('gpu_memory_allocated_mb', 0):.1f}MB, "
-                f"Transcripciones: {self._total_transcriptions}"
+                "📊 Estado: Modelo cargado %.1fh, RAM %.1fMB, VRAM %.1fMB, Transcripciones: %d",
+                uptime / 3600,
+                memory_info.get("ram_usage_mb", 0),
+                memory_info.get("gpu_memory_allocated_mb", 0),
+                self._total_transcriptions
             )
 
         except Exception as e:
-            logger.error(f"❌ Error logging status: {e}")
+            logger.error("❌ Error logging status: %s", e)
 
     async def can_process_job(self) -> bool:
         """Verificar si puede procesar un nuevo trabajo"""
@@ -165,45 +298,63 @@ class AlwaysLoadedWhisperService:
         if self._model is None:
             raise Exception("Modelo no cargado")
 
-        async with self._model_lock:
-            self._current_jobs += 1
-
+        self._current_jobs += 1
         try:
             yield self._model
         finally:
-            async with self._model_lock:
-                self._current_jobs -= 1
-
-    async def transcribe_audio(self, audio_path: str) -> Dict[str, Any]:
-        """Transcribir audio con modelo siempre cargado"""
+            self._current_jobs -= 1
+
+    @staticmethod
+    def _start_transcription(model: WhisperModel, audio: Union[str, BinaryIO], language: Optional[str]):
+        """Decodificar audio y preparar el generador lazy de segmentos (bloqueante)"""
+        if language:
+            # Idioma conocido: sin pasada de detección sobre los primeros 30s
+            return model.transcribe(audio, language=language, task="transcribe", **_TRANSCRIBE_OPTIONS)
+        return model.transcribe(audio, **_TRANSCRIBE_OPTIONS)
+
+    async def _iter_segment_texts(self, segments):
+        """Textos del generador de segmentos, un segmento por salto al executor"""
+        loop = asyncio.get_event_loop()
+        while True:
+            seg = await loop.run_in_executor(self._executor, next, segments, None)
+            if seg is None:
+                return
+            yield seg.text.strip()
+
+    async def transcribe_audio(self, audio: Union[str, BinaryIO], language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribir audio con modelo siempre cargado
+
+        Args:
+            audio: Ruta en disco o archivo binario en memoria (spool del upload)
+            language: Código ISO del idioma; None usa DEFAULT_LANGUAGE
+                (y si tampoco está configurado, autodetección)
+        """
         start_time = time.time()
 
         async with self.get_model_context() as model:
-            logger.info(f"🎤 Transcribiendo (modelo pre-cargado): {audio_path}")
+            logger.info(
+                "🎤 Transcribiendo (modelo pre-cargado): %s",
+                audio if isinstance(audio, str) else "<en memoria>"
+            )
 
             try:
-                # Transcribir en thread separado
+                # Transcribir en el executor y consumir el generador lazy de a
+                # un segmento por vez: el loop recupera el control entre
+                # segmentos en vez de esperar toda la inferencia de una vez
                 loop = asyncio.get_event_loop()
                 segments, info = await loop.run_in_executor(
-                    None,
-                    lambda: model.transcribe(
-                        audio_path,
-                        beam_size=settings.BEAM_SIZE,
-                        temperature=settings.TEMPERATURE,
-                        vad_filter=settings.VAD_FILTER,
-                        chunk_length=settings.CHUNK_LENGTH,
-                        condition_on_previous_text=settings.CONDITION_ON_PREVIOUS_TEXT
-                    )
+                    self._executor,
+                    self._start_transcription,
+                    model,
+                    audio,
+                    language or _DEFAULT_LANGUAGE
                 )
 
-                # Procesar segmentos eficientemente
-                text_parts = []
-                for seg in segments:
-                    text_parts.append(seg.text.strip())
-                    del seg  # Cleanup inmediato
+                full_text = " ".join([text async for text in self._iter_segment_texts(segments)])
 
-                full_text = " ".join(text_parts)
-                del text_parts
+                # Soltar el generador agotado: libera el estado del decoder
+                del segments
 
                 # Calcular métricas
                 processing_time = time.time() - start_time
@@ -221,36 +372,47 @@ class AlwaysLoadedWhisperService:
                 # Incrementar contador
                 self._total_transcriptions += 1
 
-                logger.info(f"✅ Transcripción completada: {speed:.1f}x en {processing_time:.2f}s (#{self._total_transcriptions})")
+                logger.info(
+                    "✅ Transcripción completada: %.1fx en %.2fs (#%d)",
+                    speed, processing_time, self._total_transcriptions
+                )
 
                 return result
 
             except Exception as e:
-                logger.error(f"❌ Error en transcripción: {e}")
+                logger.error("❌ Error en transcripción: %s", e)
                 raise
             finally:
-                # Cleanup post-transcripción (suave, sin afectar modelo)
-                if settings.AGGRESSIVE_CLEANUP:
-                    collected = gc.collect()
+                # Cleanup post-transcripción: solo generación 0 y cada 100 jobs.
+                # Un gc.collect() completo detiene el event loop decenas de ms;
+                # faster-whisper guarda sus buffers en C, fuera del GC
+                if settings.AGGRESSIVE_CLEANUP and self._total_transcriptions % 100 == 0:
+                    collected = gc.collect(0)
                     if collected > 10:  # Solo log si hay mucho que limpiar
-                        logger.debug(f"🧹 Post-transcripción cleanup: {collected} objetos")
+                        logger.debug("🧹 Post-transcripción cleanup: %d objetos", collected)
+
+    def _get_memory_info(self) -> Dict[str, Any]:
+        """Memoria GPU/RAM con caché de 200ms (evita syncs CUDA repetidos)"""
+        memory_info = self._memory_info_cache.get()
+        if memory_info is not None:
+            return memory_info
 
-    async def get_status(self) -> Dict[str, Any]:
-        """Estado actual del servicio"""
         memory_info = {}
 
-        if torch.cuda.is_available():
+        if _cuda_available():
             memory_info = {
-                "gpu_memory_allocated_mb": torch.cuda.memory_allocated() / (1024**2),
-                "gpu_memory_total_mb": torch.cuda.get_device_properties(0).total_memory / (1024**2)
+                "gpu_memory_allocated_mb": torch.cuda.memory_allocated() / _MB,
+                "gpu_memory_total_mb": _gpu_static_info()["memory_total_mb"]
             }
 
-        # Memoria RAM del proceso
-        try:
-            process = psutil.Process()
-            memory_info["ram_usage_mb"] = process.memory_info().rss / (1024**2)
-        except:
-            memory_info["ram_usage_mb"] = 0
+        # Memoria RAM del proceso (último snapshot del sampler)
+        memory_info["ram_usage_mb"] = self._ram_usage_mb
+
+        return self._memory_info_cache.set(memory_info)
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Estado actual del servicio"""
+        memory_info = self._get_memory_info()
 
         uptime = time.time() - self._model_loaded_at if self._model_loaded_at else 0
 
@@ -267,16 +429,33 @@ class AlwaysLoadedWhisperService:
             "device": settings.DEVICE
         }
 
+    def get_metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Contadores para /metrics sin syscalls ni llamadas al driver CUDA
+
+        Solo lee atributos: la memoria la muestrea _system_sampler cada 2s
+        """
+        uptime = time.time() - self._model_loaded_at if self._model_loaded_at else 0
+        model_loaded = self._model is not None
+
+        return {
+            "model_loaded": model_loaded,
+            "can_accept_jobs": model_loaded and self._current_jobs < self._max_concurrent,
+            "uptime_hours": round(uptime / 3600, 1),
+            "total_transcriptions": self._total_transcriptions,
+            "ram_usage_mb": self._ram_usage_mb,
+            "gpu_memory_allocated_mb": self._gpu_memory_mb
+        }
+
     async def update_concurrency(self, new_max: int) -> bool:
         """Actualizar límite de concurrencia dinámicamente"""
         if 1 <= new_max <= 3:
-            async with self._model_lock:
-                old_max = self._max_concurrent
-                self._max_concurrent = new_max
-                settings.MAX_CONCURRENT_JOBS = new_max
+            old_max = self._max_concurrent
+            self._max_concurrent = new_max
+            settings.MAX_CONCURRENT_JOBS = new_max
 
-                logger.info(f"🔧 Concurrencia actualizada: {old_max} → {new_max}")
-                return True
+            logger.info("🔧 Concurrencia actualizada: %s → %s", old_max, new_max)
+            return True
         return False
 
     async def force_unload(self):
@@ -285,6 +464,10 @@ class AlwaysLoadedWhisperService:
         logger.info("💡 Para reiniciar modelo, reiniciar la aplicación completa")
         return False  # No hacer nada
 
+    def shutdown(self):
+        """Cerrar el pool de inferencia (sin esperar jobs en curso)"""
+        self._executor.shutdown(wait=False)
+
     async def get_model_info(self) -> Dict[str, Any]:
         """Información detallada del modelo"""
         if not self._model:
@@ -1,24 +1,48 @@
+import os
 import time
 import asyncio
+from collections import deque
+from itertools import islice
+from functools import lru_cache
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response
+from starlette.formparsers import MultiPartParser
 
 from app.config import settings
+from app.constants import MAX_FILE_MB
 from app.api.endpoints.transcription import router as transcription_router, processing_state
-from app.utils.logger import get_logger
+from app.utils.cache import TimedCache
+from app.utils.compression import CompressionMiddleware
+from app.utils.logger import get_logger, setup_logging
 
 logger = get_logger(__name__)
 
+# Caché de /metrics (scrapers de monitoreo)
+_metrics_cache = TimedCache(settings.METRICS_CACHE_TTL)
+
+# Access log en memoria: tuplas (timestamp, método, path, status, duración µs).
+# Append O(1) sin formateo; se arma texto solo al consultar /admin/access-log.
+# Solo en DEBUG: el endpoint expone paths y timings sin autenticación
+_ACCESS_LOG_ENABLED = settings.DEBUG
+_ACCESS_LOG_MAX_LIMIT = 500
+_access_log = deque(maxlen=10000)
+
+# Tope por probe de dependencias durante el startup (segundos)
+_STARTUP_PROBE_TIMEOUT = 2.0
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestión de ciclo de vida ultra-optimizada"""
 
     # === STARTUP ===
+    setup_logging()
     logger.info("🚀 Iniciando Whisper API Always-On")
 
+    # Crear directorio uploads si no existe (antes se hacía al importar config)
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
     try:
         from app.core.whisper_service import whisper_service
 
@@ -26,7 +50,23 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Whisper service (always-loaded mode)")
 
     except Exception as e:
-        logger.error(f"❌ Error startup: {e}")
+        logger.error("❌ Error startup: %s", e)
+
+    # Verificar Redis (el cliente asíncrono conecta en el primer uso).
+    # Acotado: un Redis caído no demora el arranque más de _STARTUP_PROBE_TIMEOUT
+    from app.core.redis_semaphore import processing_semaphore
+    try:
+        redis_ok = await asyncio.wait_for(processing_semaphore.health_check(), _STARTUP_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        redis_ok = False
+    if redis_ok:
+        logger.info("✅ Redis semáforo conectado")
+    else:
+        logger.error("❌ Redis semáforo no disponible")
+
+    # Limpieza periódica de temporales y barrido de *.trash
+    from app.core.cleanup_service import cleanup_service
+    await cleanup_service.start_cleanup_task()
 
     logger.info("🎯 API always-on lista - Modelo pre-cargado")
 
@@ -35,13 +75,16 @@ async def lifespan(app: FastAPI):
     # === SHUTDOWN ===
     logger.info("🛑 Cerrando API...")
 
+    await cleanup_service.stop_cleanup_task()
+
     try:
         from app.core.whisper_service import whisper_service
         # En always-on mode, force_unload no hace nada
         await whisper_service.force_unload()
+        whisper_service.shutdown()
         logger.info("✅ Shutdown completado")
     except Exception as e:
-        logger.warning(f"⚠️ Error en shutdown: {e}")
+        logger.warning("⚠️ Error en shutdown: %s", e)
 
 
 # === APLICACIÓN ALWAYS-ON ===
@@ -51,23 +94,41 @@ app = FastAPI(
     version="3.0.0",
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url=None
 )
 
+# === UPLOADS ===
+# Spool de UploadFile en RAM hasta STREAM_FILE_THRESHOLD: los audios pequeños
+# se transcriben desde memoria sin volcarse a disco (nombre según versión)
+for _attr in ("spool_max_size", "max_file_size"):
+    if hasattr(MultiPartParser, _attr):
+        setattr(MultiPartParser, _attr, settings.STREAM_FILE_THRESHOLD)
+        break
+
 # === MIDDLEWARE ESENCIAL ===
 if settings.RESPONSE_COMPRESSION:
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # zstd/br si el cliente los acepta (transcripciones largas), si no gzip
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
 
 # Middleware ultra-rápido
 @app.middleware("http")
 async def ultra_fast_middleware(request: Request, call_next):
     """Middleware optimizado - solo timing"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()  # Monotónico: inmune a saltos NTP
     response = await call_next(request)
+    elapsed_ns = time.perf_counter_ns() - start_ns
+
+    # Sin cuerpo (204/304) el timing no aporta nada
+    if response.status_code not in (204, 304):
+        # Milisegundos enteros: sin aritmética float ni __format__
+        response.headers["X-Process-Time"] = f"{elapsed_ns // 1_000_000}ms"
 
-    process_time = (time.time() - start_time) * 1000
-    response.headers["X-Process-Time"] = f"{process_time:.1f}ms"
+    if _ACCESS_LOG_ENABLED:
+        _access_log.append((
+            time.time(), request.method, request.url.path, response.status_code, elapsed_ns // 1000
+        ))
 
     return response
 
@@ -75,9 +136,9 @@ async def ultra_fast_middleware(request: Request, call_next):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Manejador global ultra-simple"""
-    logger.error(f"❌ Error: {request.method} {request.url.path} - {exc}")
+    logger.error("❌ Error: %s %s - %s", request.method, request.url.path, exc)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Error interno del servidor",
@@ -94,6 +155,32 @@ app.include_router(
 )
 
 # === ENDPOINTS RAÍZ ===
+@lru_cache(maxsize=1)
+def _static_root_info() -> dict:
+    """Secciones estáticas de la info raíz (solo dependen de settings)"""
+    return {
+        "config": {
+            "model": settings.MODEL_SIZE,
+            "max_file_mb": MAX_FILE_MB,
+            "supported_formats": settings.ALLOWED_EXTENSIONS,
+            "always_loaded": True,
+            "lazy_loading": False
+        },
+        "endpoints": {
+            "transcribe": "POST /api/v1/transcribe (modelo pre-cargado)",
+            "status": "GET /api/v1/status",
+            "health": "GET /api/v1/health",
+            "cancel": "POST /api/v1/cancel",
+            "docs": "/docs"
+        },
+        "usage": {
+            "simple": "curl -F 'file=@audio.mp3' http://localhost:8000/api/v1/transcribe",
+            "check_status": "curl http://localhost:8000/api/v1/status",
+            "if_busy": "Recibirás HTTP 202 con 'retry_after' si está procesando"
+        }
+    }
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz con información de la API always-on"""
@@ -101,92 +188,138 @@ async def root():
         from app.core.whisper_service import whisper_service
 
         service_status = await whisper_service.get_status()
+        static_info = _static_root_info()
+        state = processing_state.snapshot()
 
-        return {
+        # Response directa: FastAPI no pasa el dict por jsonable_encoder
+        return ORJSONResponse({
             "service": "Whisper API Always-On Ultra-Optimizada",
             "version": "3.0.0",
             "mode": "always_loaded",
             "description": "Modelo siempre cargado → Máxima velocidad constante",
-            "status": "processing" if processing_state["is_processing"] else "ready",
+            "status": "processing" if state.is_processing else "ready",
             "current_load": {
-                "is_processing": processing_state["is_processing"],
-                "can_accept": not processing_state["is_processing"] and service_status["can_accept_jobs"],
-                "current_job": processing_state.get("current_job"),
+                "is_processing": state.is_processing,
+                "can_accept": not state.is_processing and service_status["can_accept_jobs"],
+                "current_job": state.current_job,
                 "model_uptime_hours": service_status.get("uptime_hours", 0)
             },
-            "config": {
-                "model": settings.MODEL_SIZE,
-                "max_file_mb": settings.MAX_FILE_SIZE // (1024 * 1024),
-                "supported_formats": settings.ALLOWED_EXTENSIONS,
-                "always_loaded": True,
-                "lazy_loading": False
-            },
+            "config": static_info["config"],
             "performance": {
                 "model_preloaded": service_status.get("model_loaded", False),
                 "total_transcriptions": service_status.get("total_transcriptions", 0),
                 "estimated_response_time": "~70 segundos constante",
                 "no_loading_delays": True
             },
-            "endpoints": {
-                "transcribe": "POST /api/v1/transcribe (modelo pre-cargado)",
-                "status": "GET /api/v1/status",
-                "health": "GET /api/v1/health",
-                "cancel": "POST /api/v1/cancel",
-                "docs": "/docs"
-            },
-            "usage": {
-                "simple": "curl -F 'file=@audio.mp3' http://localhost:8000/api/v1/transcribe",
-                "check_status": "curl http://localhost:8000/api/v1/status",
-                "if_busy": "Recibirás HTTP 202 con 'retry_after' si está procesando"
-            },
+            "endpoints": static_info["endpoints"],
+            "usage": static_info["usage"],
             "hardware": {
                 "device": settings.DEVICE,
                 "compute_type": settings.COMPUTE_TYPE,
                 "memory_mb": round(service_status["memory_info"].get("ram_usage_mb", 0), 1),
                 "gpu_memory_mb": round(service_status["memory_info"].get("gpu_memory_allocated_mb", 0), 1)
             }
-        }
+        })
 
     except Exception as e:
-        logger.error(f"❌ Error endpoint raíz: {e}")
-        return {
+        logger.error("❌ Error endpoint raíz: %s", e)
+        return ORJSONResponse({
             "service": "Whisper API Always-On",
             "status": "degraded",
             "error": "Error obteniendo estado completo",
             "mode": "always_loaded",
             "note": "El modelo debería estar cargándose en background"
-        }
+        })
+
+def _refresh_metrics() -> dict:
+    """Recalcular métricas desde el snapshot del servicio (O(1), sin await)"""
+    from app.core.whisper_service import whisper_service
+
+    snapshot = whisper_service.get_metrics_snapshot()
+    state = processing_state.snapshot()
+
+    return _metrics_cache.set({
+        "whisper_processing": 1 if state.is_processing else 0,
+        "whisper_available": 1 if snapshot["can_accept_jobs"] and not state.is_processing else 0,
+        "whisper_model_loaded": 1 if snapshot["model_loaded"] else 0,
+        "whisper_model_always_loaded": 1,
+        "whisper_uptime_hours": snapshot["uptime_hours"],
+        "whisper_total_transcriptions": snapshot["total_transcriptions"],
+        "whisper_memory_mb": snapshot["ram_usage_mb"],
+        "whisper_gpu_memory_mb": snapshot["gpu_memory_allocated_mb"]
+    })
+
+
+def _prometheus_text(metrics: dict) -> str:
+    """Formato de exposición de texto de Prometheus (métricas numéricas)"""
+    return "".join(
+        f"{name} {value}\n"
+        for name, value in metrics.items()
+        if isinstance(value, (int, float))
+    )
+
 
 @app.get("/metrics")
-async def minimal_metrics():
-    """Métricas básicas para monitoreo"""
+async def minimal_metrics(request: Request):
+    """
+    Métricas básicas para monitoreo (snapshot en memoria, caché corta)
+
+    Scrapers de Prometheus (Accept: text/plain u openmetrics) reciben el
+    formato de texto; el resto, JSON.
+    """
     try:
-        from app.core.whisper_service import whisper_service
+        metrics = _metrics_cache.get()
+        if metrics is None:
+            metrics = _refresh_metrics()
+
+        metrics = {
+            **metrics,
+            "metrics_cache_hits": _metrics_cache.hits,
+            "metrics_cache_misses": _metrics_cache.misses
+        }
 
-        service_status = await whisper_service.get_status()
+        accept = request.headers.get("accept", "")
+        if "text/plain" in accept or "openmetrics" in accept:
+            return PlainTextResponse(_prometheus_text(metrics), media_type="text/plain; version=0.0.4")
 
-        return {
-            "whisper_processing": 1 if processing_state["is_processing"] else 0,
-            "whisper_available": 1 if service_status["can_accept_jobs"] and not processing_state["is_processing"] else 0,
-            "whisper_model_loaded": 1 if service_status["model_loaded"] else 0,
-            "whisper_model_always_loaded": 1 if service_status.get("model_always_loaded", False) else 0,
-            "whisper_uptime_hours": service_status.get("uptime_hours", 0),
-            "whisper_total_transcriptions": service_status.get("total_transcriptions", 0),
-            "whisper_memory_mb": service_status["memory_info"].get("ram_usage_mb", 0),
-            "whisper_gpu_memory_mb": service_status["memory_info"].get("gpu_memory_allocated_mb", 0)
-        }
+        # Response directa: sin pasar por jsonable_encoder
+        return ORJSONResponse(metrics)
 
     except Exception as e:
-        logger.error(f"❌ Error métricas: {e}")
-        return {"error": "métricas no disponibles"}
-
-@app.get("/favicon.ico")
+        logger.error("❌ Error métricas: %s", e)
+        return ORJSONResponse({"error": "métricas no disponibles"})
+
+if _ACCESS_LOG_ENABLED:
+    @app.get("/admin/access-log", include_in_schema=False)
+    async def access_log(limit: int = 100):
+        """Últimos requests del access log en memoria (formateado solo acá)"""
+        # Recorrer desde el final: O(limit), sin copiar todo el deque
+        limit = max(0, min(limit, _ACCESS_LOG_MAX_LIMIT))
+        entries = list(islice(reversed(_access_log), limit))
+        entries.reverse()
+        return ORJSONResponse({
+            "entries": [
+                {"timestamp": ts, "method": method, "path": path, "status": status, "duration_us": duration_us}
+                for ts, method, path, status, duration_us in entries
+            ],
+            "buffered": len(_access_log),
+            "capacity": _access_log.maxlen
+        })
+
+
+# Respuesta constante: sin cuerpo ni serialización
+_FAVICON_RESPONSE = Response(status_code=204)
+
+
+@app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     """Evitar logs 404 de favicon"""
-    return JSONResponse(status_code=204, content=None)
+    return _FAVICON_RESPONSE
 
 # === STARTUP DIRECTO ===
 if __name__ == "__main__":
+    import sys
+    import importlib.util
     import uvicorn
 
     logger.info("🚀 Iniciando servidor always-on directo...")
@@ -198,5 +331,8 @@ if __name__ == "__main__":
         workers=1,
         log_level="warning",
         access_log=False,
-        reload=False
+        reload=False,
+        loop="uvloop" if sys.platform != "win32" and importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        limit_concurrency=settings.LIMIT_CONCURRENCY
     )
\ No newline at end of file
@@ -1,19 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-from enum import Enum
+from typing import Literal, Optional
 
-
-class JobStatus(str, Enum):
-    PENDING = "pending"
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
+# Estados válidos (constantes en app.core.redis_queue). Literal valida
+# los valores sin el costo de construir miembros de Enum
+JobStatusValue = Literal["pending", "processing", "completed", "failed"]
+_STATUS_DESCRIPTION = "pending | processing | completed | failed"
 
 
 class TranscriptionResponse(BaseModel):
     """Respuesta al crear una transcripción"""
     job_id: str = Field(..., description="ID único del trabajo")
-    status: JobStatus = Field(..., description="Estado del trabajo")
+    status: JobStatusValue = Field(..., description=f"Estado del trabajo ({_STATUS_DESCRIPTION})")
     queue_position: Optional[int] = Field(None, description="Posición en la cola")
     estimated_wait: Optional[str] = Field(None, description="Tiempo estimado de espera")
     response_time_ms: Optional[float] = Field(None, description="Tiempo de respuesta en ms")
@@ -22,7 +19,7 @@ class TranscriptionResponse(BaseModel):
 class JobStatusResponse(BaseModel):
     """Respuesta de estado de trabajo"""
     job_id: str = Field(..., description="ID del trabajo")
-    status: JobStatus = Field(..., description="Estado actual")
+    status: JobStatusValue = Field(..., description=f"Estado actual ({_STATUS_DESCRIPTION})")
     filename: Optional[str] = Field(None, description="Nombre del archivo")
     created_at: Optional[float] = Field(None, description="Timestamp de creación")
     started_at: Optional[float] = Field(None, description="Timestamp de inicio")
@@ -35,7 +32,7 @@ class JobStatusResponse(BaseModel):
 class TranscriptionResult(BaseModel):
     """Resultado completo de transcripción"""
     job_id: str = Field(..., description="ID del trabajo")
-    status: JobStatus = Field(..., description="Estado del trabajo")
+    status: JobStatusValue = Field(..., description=f"Estado del trabajo ({_STATUS_DESCRIPTION})")
     filename: Optional[str] = Field(None, description="Nombre del archivo original")
     text: Optional[str] = Field(None, description="Texto transcrito")
     duration: Optional[float] = Field(None, description="Duración del audio en segundos")
@@ -0,0 +1,58 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class TimedCache:
+    """
+    Caché en memoria de un único valor con TTL
+    Pensado para respuestas de monitoreo consultadas en ráfaga
+    """
+
+    __slots__ = ("ttl", "_value", "_expires_at", "hits", "misses", "_lock")
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Any = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._lock: Optional[asyncio.Lock] = None  # Creado con el loop activo
+
+    def get(self) -> Optional[Any]:
+        """Valor cacheado o None si expiró"""
+        if time.monotonic() < self._expires_at:
+            self.hits += 1
+            return self._value
+        self.misses += 1
+        return None
+
+    def set(self, value: Any) -> Any:
+        """Guardar valor y reiniciar TTL"""
+        self._value = value
+        self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        """Forzar refresco en la próxima lectura"""
+        self._expires_at = 0.0
+
+    async def get_or_refresh(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Valor cacheado o refrescado con `factory`, coalesciendo llamadas
+
+        Los callers concurrentes con caché expirada esperan un único
+        refresco en vez de lanzar uno cada uno
+        """
+        value = self.get()
+        if value is not None:
+            return value
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            # Otro caller pudo refrescar mientras esperábamos el lock
+            if time.monotonic() < self._expires_at:
+                return self._value
+            return self.set(await factory())
@@ -0,0 +1,155 @@
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Codificadores opcionales: sin las librerías se negocia solo gzip
+try:
+    import zstandard
+    _zstd_compress = zstandard.ZstdCompressor(level=3).compress
+except ImportError:
+    _zstd_compress = None
+
+try:
+    import brotli
+
+    def _br_compress(data: bytes) -> bytes:
+        return brotli.compress(data, quality=4)
+except ImportError:
+    _br_compress = None
+
+# Preferencia del servidor: zstd (mejor ratio/CPU) > br > gzip
+_ENCODERS = tuple(
+    (name, compress)
+    for name, compress in (("zstd", _zstd_compress), ("br", _br_compress))
+    if compress is not None
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> dict:
+    """Codificaciones aceptadas por el cliente con su q (sin las de q=0)"""
+    accepted = {}
+    for token in accept_encoding.split(","):
+        name, _, params = token.strip().partition(";")
+        params = params.replace(" ", "")
+        q = 1.0
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if q > 0:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def _choose_encoder(accepted: dict) -> Optional[tuple]:
+    """
+    (nombre, compresor) con el mayor q del cliente; None si gana gzip
+
+    El orden del servidor (zstd > br > gzip) solo desempata.
+    """
+    best, best_q = None, 0.0
+    for encoder in _ENCODERS:
+        q = accepted.get(encoder[0], 0.0)
+        if q > best_q:
+            best, best_q = encoder, q
+
+    # gzip es el último en preferencia: solo gana con q estrictamente mayor
+    if accepted.get("gzip", 0.0) > best_q:
+        return None
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresión negociada por Accept-Encoding: zstd, br o gzip
+
+    Gana la codificación con mayor q del cliente (el orden del servidor
+    solo desempata). Para zstd/br se bufferiza el body completo de las
+    respuestas con Content-Length y se comprime de una vez; las streaming
+    pasan sin comprimir. Si gana gzip (o no hay librerías) delega en
+    GZipMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _ENCODERS:
+            await self.gzip(scope, receive, send)
+            return
+
+        encoder = _choose_encoder(_accepted_encodings(Headers(scope=scope).get("accept-encoding", "")))
+        if encoder is None:
+            await self.gzip(scope, receive, send)
+            return
+
+        name, compress = encoder
+        responder = _BufferedResponder(self.app, name, compress, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _BufferedResponder:
+    """
+    Acumula el body de una respuesta y lo envía comprimido
+
+    Solo bufferiza respuestas con Content-Length (cuerpo completo y acotado):
+    las streaming, las ya codificadas y las chicas pasan sin tocar.
+    """
+
+    # Uno por request comprimido: sin __dict__
+    __slots__ = (
+        "app", "encoding", "compress", "minimum_size", "send",
+        "start_message", "chunks", "passthrough"
+    )
+
+    def __init__(self, app: ASGIApp, encoding: str, compress: Callable[[bytes], bytes], minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.compress = compress
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.chunks = []
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            length = headers.get("content-length")
+            # Sin Content-Length (StreamingResponse) no se bufferiza un
+            # stream de tamaño desconocido; tampoco lo ya codificado o chico
+            if (length is None or not length.isdigit() or int(length) < self.minimum_size
+                    or "content-encoding" in headers):
+                self.passthrough = True
+                await self.send(message)
+                return
+            self.start_message = message
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        self.chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+
+        body = b"".join(self.chunks)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        body = self.compress(body)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Length"] = str(len(body))
+
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": body})
@@ -1,65 +1,114 @@
 import logging
 import sys
+from functools import lru_cache
 from app.config import settings
 
 
-class MinimalLogger:
-    """Logger ultra-minimalista para máximo rendimiento"""
+# Rutas de polling de monitoreo: no generan línea de access log
+_QUIET_ACCESS_PATHS = ("/metrics", "/health")
+
+
+class _QuietPollingFilter(logging.Filter):
+    """Descarta del access log de uvicorn las rutas de polling"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # args de uvicorn.access: (client, method, path, http_version, status)
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3:
+            return not str(args[2]).startswith(_QUIET_ACCESS_PATHS)
+        return True
+
+
+# Fast-path: en modo minimal solo pasan errores (un solo chequeo de bool)
+_DISABLED = settings.MINIMAL_LOGGING
+
+# Nivel efectivo resuelto una sola vez
+_LEVEL = getattr(logging, settings.LOG_LEVEL.upper(), logging.WARNING)
+if _DISABLED:
+    _LEVEL = max(_LEVEL, logging.ERROR)
+
+_configured = False
 
-    def __init__(self, name: str):
-        self.name = name
-        self.level = getattr(logging, settings.LOG_LEVEL.upper(), logging.WARNING)
 
-        # Solo configurar una vez
-        if not hasattr(MinimalLogger, '_configured'):
-            self._setup_logging()
-            MinimalLogger._configured = True
+def _noop(message: str, *args) -> None:
+    """Destino de los niveles filtrados"""
 
-    def _setup_logging(self):
-        """Configuración mínima de logging"""
 
-        # Formato ultra-simple
-        formatter = logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(message)s',
-            datefmt='%H:%M:%S'
-        )
+def setup_logging() -> None:
+    """
+    Configuración mínima de logging (idempotente)
 
-        # Handler a consola
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        console_handler.setLevel(self.level)
+    Explícita y no al importar: checks cortos como los de run.py no
+    instalan handlers. La app la llama al iniciar el lifespan.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
 
-        # Logger raíz
-        root_logger = logging.getLogger()
-        root_logger.setLevel(self.level)
-        root_logger.handlers.clear()  # Limpiar handlers existentes
-        root_logger.addHandler(console_handler)
+    # Formato ultra-simple
+    formatter = logging.Formatter(
+        '%(asctime)s [%(levelname)s] %(message)s',
+        datefmt='%H:%M:%S'
+    )
 
-        # Silenciar loggers verbosos
-        logging.getLogger("uvicorn.access").setLevel(logging.ERROR)
-        logging.getLogger("multipart").setLevel(logging.ERROR)
+    # Handler a consola
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(_LEVEL)
 
-        if settings.MINIMAL_LOGGING:
-            # En modo minimal, solo errores críticos
-            root_logger.setLevel(logging.ERROR)
+    # Logger raíz (en modo minimal _LEVEL ya es ERROR: solo errores críticos)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(_LEVEL)
+    root_logger.handlers.clear()  # Limpiar handlers existentes
+    root_logger.addHandler(console_handler)
+
+    # El formato no usa thread/proceso: LogRecord no los consulta por registro
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False  # Python 3.12+
+
+    # Silenciar loggers verbosos
+    logging.getLogger("uvicorn.access").setLevel(logging.ERROR)
+    # El filtro sobrevive al dictConfig de uvicorn (que sí resetea el nivel)
+    logging.getLogger("uvicorn.access").addFilter(_QuietPollingFilter())
+    logging.getLogger("multipart").setLevel(logging.ERROR)
+
+
+class MinimalLogger:
+    """
+    Logger ultra-minimalista para máximo rendimiento
+
+    Fachada sobre logging.Logger: los niveles habilitados se resuelven una
+    vez al crear el logger y el formateo %-style lo hace el handler solo
+    para los mensajes que se emiten.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.level = _LEVEL
 
-    def info(self, message: str):
-        if self.level <= logging.INFO:
-            print(f"[INFO] {message}")
+        self._log = logging.getLogger(name)
 
-    def warning(self, message: str):
-        if self.level <= logging.WARNING:
-            print(f"[WARN] {message}")
+        # Métodos resueltos una vez por logger: nivel filtrado → no-op,
+        # habilitado → método ligado de logging.Logger (sin chequeo por llamada)
+        self.debug = self._log.debug if self.level <= logging.DEBUG else _noop
+        self.info = self._log.info if self.level <= logging.INFO else _noop
+        self.warning = self._log.warning if self.level <= logging.WARNING else _noop
+        self.error = self._log.error
 
-    def error(self, message: str):
-        if self.level <= logging.ERROR:
-            print(f"[ERROR] {message}")
+    def isEnabledFor(self, level: int) -> bool:
+        """Compatibilidad con logging.Logger para guardar logs costosos"""
+        return self.level <= level
 
-    def debug(self, message: str):
-        if self.level <= logging.DEBUG:
-            print(f"[DEBUG] {message}")
+    def log(self, level: int, message: str, *args):
+        """Log genérico: los args se sustituyen recién al emitir"""
+        if self.level <= level:
+            self._log.log(level, message, *args)
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> MinimalLogger:
-    """Obtener logger minimalista"""
+    """Obtener logger minimalista (una instancia por nombre)"""
     return MinimalLogger(name)
\ No newline at end of file
@@ -6,23 +6,90 @@
 import os
 import sys
 import time
-import psutil
-import asyncio
+import importlib.metadata
+import importlib.util
+import io
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 from pathlib import Path
 
 # Agregar directorio actual al path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+# --quiet (o SUSURRO_QUIET=1 cuando no se controla la línea de comandos,
+# ej. reinicios bajo systemd/containers): sin banner ni mensajes
+# informativos; errores y warnings se siguen mostrando
+QUIET = "--quiet" in sys.argv[1:] or os.environ.get("SUSURRO_QUIET") == "1"
+
+# Event loop y parser HTTP resueltos una vez: uvicorn no pasa por su
+# camino de error/fallback si la extensión no está instalada
+_LOOP = "uvloop" if sys.platform != "win32" and importlib.util.find_spec("uvloop") else "asyncio"
+_HTTP = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+_RULE = "=" * 60
+
+# Bloques de texto armados como una plantilla: un solo write a stdout
+_BANNER = (
+    "\n%s\n"
+    "🎤 WHISPER API ULTRA-OPTIMIZADA\n"
+    "%s\n"
+    "🎯 Objetivo: Máxima eficiencia, mínima memoria\n"
+    "⚡ Always-loaded + Auto cleanup + Response < 100ms\n"
+    "%s\n"
+) % (_RULE, _RULE, _RULE)
+
+# Banner ya codificado: un write directo al buffer binario de stdout
+_BANNER_BYTES = _BANNER.encode(getattr(sys.stdout, "encoding", None) or "utf-8", errors="replace")
+
+_CONFIG_TEMPLATE = (
+    "\n📋 Configuración Ultra-Optimizada:\n"
+    "   🧠 Modelo: %s\n"
+    "   🔀 Concurrencia máx: %s\n"
+    "   📁 Archivo máx: %sMB\n"
+    "   ⚡ Lazy loading: %s\n"
+    "   🧹 Cleanup agresivo: %s\n"
+    "   🗜️ Compresión: %s\n"
+    "   📊 Log mínimo: %s\n"
+    "   🕒 Descarga modelo: %ss\n"
+    "   🖥️ Dispositivo: %s\n"
+    "   🔢 Tipo compute: %s\n"
+    "   🧵 OMP/MKL threads: %s\n"
+)
+
+
+def _write(text: str):
+    """Emitir un bloque completo con un único write + flush"""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+_SETTINGS = None
+
+
+def _get_settings():
+    """Settings memoizados en el launcher (import diferido de pydantic)"""
+    global _SETTINGS
+    if _SETTINGS is None:
+        from app.config import get_settings
+        _SETTINGS = get_settings()
+    return _SETTINGS
+
 
 def print_banner():
     """Banner de inicio"""
-    print("\n" + "="*60)
-    print("🎤 WHISPER API ULTRA-OPTIMIZADA")
-    print("="*60)
-    print("🎯 Objetivo: Máxima eficiencia, mínima memoria")
-    print("⚡ Always-loaded + Auto cleanup + Response < 100ms")
-    print("="*60)
+    if QUIET:
+        return
+    stream = getattr(sys.stdout, "buffer", None)
+    if stream is None:
+        _write(_BANNER)  # stdout reemplazado (sin buffer binario)
+        return
+    sys.stdout.flush()  # Respetar el orden con texto previo
+    stream.write(_BANNER_BYTES)
+    stream.flush()
 
 
 def check_python_version():
@@ -31,18 +98,63 @@ def check_python_version():
         print("❌ Python 3.8+ requerido")
         print(f"   Versión actual: {sys.version}")
         sys.exit(1)
-    print(f"✅ Python {sys.version.split()[0]}")
+    if not QUIET:
+        print(f"✅ Python {sys.version.split()[0]}")
     return True
 
 
+def _memory_bytes():
+    """
+    (disponible, total) en bytes
+
+    En Linux una sola lectura de /proc/meminfo, sin importar psutil (extensión
+    C que parsea todas las líneas); psutil solo como fallback.
+    """
+    if sys.platform.startswith("linux"):
+        with open("/proc/meminfo", "rb") as f:
+            data = f.read(1024)  # MemTotal/MemAvailable están en las primeras líneas
+        total = re.search(rb"MemTotal:\s+(\d+)", data)
+        available = re.search(rb"MemAvailable:\s+(\d+)", data)
+        if total and available:
+            return int(available.group(1)) * 1024, int(total.group(1)) * 1024  # kB → bytes
+
+    import psutil  # Diferido: solo fuera de Linux (o kernels sin MemAvailable)
+
+    memory = psutil.virtual_memory()
+    return memory.available, memory.total
+
+
+@lru_cache(maxsize=1)
+def _cpu_count() -> int:
+    """CPUs en línea vía sysconf (sin /proc ni psutil); os.cpu_count fuera de POSIX"""
+    try:
+        return max(1, os.sysconf("SC_NPROCESSORS_ONLN"))
+    except (AttributeError, ValueError, OSError):
+        return os.cpu_count() or 1
+
+
+def _omp_threads() -> int:
+    """
+    Threads de OpenMP/MKL por proceso
+
+    Los cores se reparten entre los jobs concurrentes (mínimo 2, nunca más
+    que los cores): en hosts grandes BLAS deja de quedar topado en 2.
+    """
+    ncpu = _cpu_count()
+    jobs = max(1, _get_settings().MAX_CONCURRENT_JOBS)
+    return min(ncpu, max(2, ncpu // jobs))
+
+
 def check_system_resources():
     """Verificar recursos del sistema"""
     try:
-        memory = psutil.virtual_memory()
-        available_gb = memory.available / (1024**3)
-        total_gb = memory.total / (1024**3)
+        available_bytes, total_bytes = _memory_bytes()
+        available_gb = available_bytes / (1024**3)
+        total_gb = total_bytes / (1024**3)
 
-        print(f"💾 RAM: {available_gb:.1f}GB disponible / {total_gb:.1f}GB total")
+        if not QUIET:
+            print(f"💾 RAM: {available_gb:.1f}GB disponible / {total_gb:.1f}GB total")
+            print(f"🧮 CPUs en línea: {_cpu_count()}")
 
         if available_gb < 2:
             print("⚠️ Poca memoria disponible (< 2GB)")
@@ -55,30 +167,122 @@ def check_system_resources():
         return True  # Continuar de todas formas
 
 
+def _cuda_devices_driver():
+    """
+    [(nombre, VRAM en bytes)] vía la Driver API de CUDA (libcuda, ctypes)
+
+    Sin importar torch (MKL/OpenMP + cientos de .so). None si la librería
+    del driver no está instalada.
+    """
+    import ctypes
+
+    try:
+        libcuda = ctypes.CDLL("nvcuda.dll" if sys.platform == "win32" else "libcuda.so.1")
+    except OSError:
+        return None
+
+    # CUDA_ERROR_NO_DEVICE y similares: driver presente pero sin GPU usable
+    if libcuda.cuInit(0) != 0:
+        return []
+
+    count = ctypes.c_int()
+    if libcuda.cuDeviceGetCount(ctypes.byref(count)) != 0:
+        return []
+
+    devices = []
+    for i in range(count.value):
+        device = ctypes.c_int()
+        name = ctypes.create_string_buffer(256)
+        total = ctypes.c_size_t()
+        if (libcuda.cuDeviceGet(ctypes.byref(device), i) != 0
+                or libcuda.cuDeviceGetName(name, len(name), device) != 0
+                or libcuda.cuDeviceTotalMem_v2(ctypes.byref(total), device) != 0):
+            continue
+        devices.append((name.value.decode(errors="replace"), total.value))
+    return devices
+
+
+def _cuda_devices_smi():
+    """[(nombre, VRAM en bytes)] con una sola llamada a nvidia-smi; None si no está"""
+    import shutil
+    import subprocess
+
+    smi = shutil.which("nvidia-smi")
+    if smi is None:
+        return None
+
+    output = subprocess.run(
+        [smi, "--query-gpu=name,memory.total", "--format=csv,noheader,nounits"],
+        capture_output=True, text=True, timeout=5
+    )
+    if output.returncode != 0:
+        return []
+
+    devices = []
+    for line in output.stdout.splitlines():
+        name, _, memory_mib = line.rpartition(",")
+        if name:
+            devices.append((name.strip(), int(memory_mib.strip()) * 1024 * 1024))
+    return devices
+
+
 def check_gpu():
-    """Verificar GPU disponible"""
+    """Verificar GPU disponible (driver CUDA o nvidia-smi, sin torch)"""
     try:
-        import torch
-        if torch.cuda.is_available():
-            gpu_count = torch.cuda.device_count()
-            for i in range(gpu_count):
-                gpu_name = torch.cuda.get_device_name(i)
-                props = torch.cuda.get_device_properties(i)
-                gpu_memory_gb = props.total_memory / (1024**3)
-                print(f"🎮 GPU {i}: {gpu_name} ({gpu_memory_gb:.1f}GB VRAM)")
+        devices = _cuda_devices_driver()
+        if devices is None:
+            devices = _cuda_devices_smi() or []
+
+        if devices:
+            if not QUIET:
+                for i, (gpu_name, total_memory) in enumerate(devices):
+                    gpu_memory_gb = total_memory / (1024**3)
+                    print(f"🎮 GPU {i}: {gpu_name} ({gpu_memory_gb:.1f}GB VRAM)")
             return True
         else:
             print("⚠️ GPU CUDA no disponible, usando CPU")
             return False
 
-    except ImportError:
-        print("❌ PyTorch no instalado")
-        return False
     except Exception as e:
         print(f"⚠️ Error verificando GPU: {e}")
         return False
 
 
+def ensure_upload_dir():
+    """Crear UPLOAD_DIR y verificar que se pueda escribir"""
+    upload_dir = Path(_get_settings().UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    if not os.access(upload_dir, os.W_OK):
+        print(f"⚠️ Sin permiso de escritura en {upload_dir.absolute()}")
+        return False
+
+    if not QUIET:
+        print(f"📁 Directorio de uploads: {upload_dir.absolute()}")
+    return True
+
+
+@lru_cache(maxsize=None)
+def _is_installed(module: str) -> bool:
+    """
+    Paquete presente sin ejecutarlo (find_spec no importa el módulo)
+
+    Memoizado: los chequeos repetidos no vuelven a recorrer sys.path
+    """
+    return importlib.util.find_spec(module) is not None
+
+
+@lru_cache(maxsize=1)
+def _installed_distributions() -> frozenset:
+    """
+    Nombres normalizados de las distribuciones instaladas (una sola pasada)
+
+    pydantic-settings -> pydantic_settings: coincide con el nombre del módulo
+    """
+    names = (dist.metadata["Name"] for dist in importlib.metadata.distributions())
+    return frozenset(name.lower().replace("-", "_") for name in names if name)
+
+
 def verify_dependencies():
     """Verificar dependencias críticas"""
     critical_deps = [
@@ -87,18 +291,22 @@ def verify_dependencies():
         ("redis", "Redis client"),
         ("faster_whisper", "Whisper model"),
         ("torch", "PyTorch"),
-        ("aiofiles", "Async file operations"),
+        ("orjson", "Fast JSON serialization"),
+        ("msgpack", "Redis state serialization"),
         ("pydantic_settings", "Settings management")
     ]
 
     missing = []
-    print("🔍 Verificando dependencias:")
+    if not QUIET:
+        print("🔍 Verificando dependencias:")
 
     for dep, description in critical_deps:
-        try:
-            __import__(dep)
-            print(f"   ✅ {dep}")
-        except ImportError:
+        # Sin importar: torch tarda ~1s y el import real lo hace la app.
+        # find_spec solo si no figura como distribución (instalaciones sin metadata)
+        if dep in _installed_distributions() or _is_installed(dep):
+            if not QUIET:
+                print(f"   ✅ {dep}")
+        else:
             missing.append(f"{dep} ({description})")
             print(f"   ❌ {dep} - {description}")
 
@@ -109,24 +317,55 @@ def verify_dependencies():
         print("\n💡 Instalar con: pip install -r requirements.txt")
         return False
 
-    print("✅ Todas las dependencias verificadas")
+    if not QUIET:
+        print("✅ Todas las dependencias verificadas")
     return True
 
 
+_redis_probe = None
+
+
+def _get_redis_probe():
+    """Cliente Redis síncrono para los chequeos, reutilizado entre llamadas"""
+    global _redis_probe
+    if _redis_probe is None:
+        import redis
+        settings = _get_settings()
+
+        _redis_probe = redis.Redis(connection_pool=redis.ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            # Un PING local responde en < 1ms: 1s acota el peor caso del chequeo
+            socket_connect_timeout=1,
+            socket_timeout=1,
+            health_check_interval=30,
+            max_connections=2
+        ))
+    return _redis_probe
+
+
 def test_redis():
     """Verificar conexión Redis"""
     try:
-        # Usar redis_semaphore en lugar de redis_queue
-        from app.core.redis_semaphore import processing_semaphore
-
-        # Test asíncrono
-        async def test_connection():
-            return await processing_semaphore.health_check()
+        # PING síncrono: sin levantar un event loop (ni importar el semáforo)
+        # solo para un chequeo puntual. La conexión queda en el pool para
+        # chequeos siguientes
+        import redis
 
-        result = asyncio.run(test_connection())
+        global _redis_probe
+        try:
+            result = _get_redis_probe().ping()
+        except (redis.ConnectionError, redis.TimeoutError):
+            # Descartar el pool: el próximo chequeo reconecta desde cero
+            _redis_probe.connection_pool.disconnect()
+            _redis_probe = None
+            result = False
 
         if result:
-            print("✅ Redis conectado")
+            if not QUIET:
+                print("✅ Redis conectado")
             return True
         else:
             print("❌ Redis no disponible")
@@ -143,38 +382,44 @@ def test_redis():
         return False
 
 
+# Optimizaciones CPU/GPU (solo si el entorno no las define ya).
+# OMP/MKL se recalculan en setup_environment según cores y concurrencia
+_ENV_DEFAULTS = {
+    "OMP_NUM_THREADS": "2",
+    "MKL_NUM_THREADS": "2",
+    "TOKENIZERS_PARALLELISM": "false",
+    "PYTORCH_CUDA_ALLOC_CONF": "max_split_size_mb:128"
+}
+
+# Valores efectivos tras setup_environment (solo lectura): quien los
+# necesite lee este dict en vez de os.environ/getenv
+ENV = MappingProxyType({})
+
+
 def setup_environment():
     """Configurar variables de entorno para optimización"""
+    global ENV
     try:
-        print("🔧 Configurando variables de entorno...")
-
-        # Optimizaciones CPU/GPU
-        optimizations = {
-            "OMP_NUM_THREADS": "2",
-            "MKL_NUM_THREADS": "2",
-            "TOKENIZERS_PARALLELISM": "false",
-            "PYTORCH_CUDA_ALLOC_CONF": "max_split_size_mb:128"
-        }
-
-        applied_count = 0
-        for var, value in optimizations.items():
-            old_value = os.environ.get(var)
-            os.environ.setdefault(var, value)
-
-            if old_value != value:
-                applied_count += 1
-                print(f"   📝 {var}={value}")
-
-        # Verificar variables críticas
-        critical_vars = ["OMP_NUM_THREADS", "PYTORCH_CUDA_ALLOC_CONF"]
-        for var in critical_vars:
-            if var not in os.environ:
-                print(f"   ⚠️ Variable crítica {var} no configurada")
-
-        if applied_count > 0:
-            print(f"⚡ {applied_count} optimizaciones de entorno aplicadas")
+        lines = ["🔧 Configurando variables de entorno..."]
+
+        threads = str(_omp_threads())
+        defaults = {**_ENV_DEFAULTS, "OMP_NUM_THREADS": threads, "MKL_NUM_THREADS": threads}
+
+        # Un solo merge con las que faltan (setdefault de a una no hace falta)
+        missing = {var: value for var, value in defaults.items() if var not in os.environ}
+        os.environ.update(missing)
+        ENV = MappingProxyType({var: os.environ[var] for var in _ENV_DEFAULTS})
+
+        for var, value in missing.items():
+            lines.append("   📝 %s=%s" % (var, value))
+
+        if missing:
+            lines.append("⚡ %d optimizaciones de entorno aplicadas" % len(missing))
         else:
-            print("⚡ Variables de entorno ya configuradas")
+            lines.append("⚡ Variables de entorno ya configuradas")
+
+        if not QUIET:
+            _write("\n".join(lines) + "\n")
 
         return True
 
@@ -186,19 +431,28 @@ def setup_environment():
 def load_config():
     """Cargar y mostrar configuración"""
     try:
-        from app.config import settings
-
-        print(f"\n📋 Configuración Ultra-Optimizada:")
-        print(f"   🧠 Modelo: {settings.MODEL_SIZE}")
-        print(f"   🔀 Concurrencia máx: {settings.MAX_CONCURRENT_JOBS}")
-        print(f"   📁 Archivo máx: {settings.MAX_FILE_SIZE // (1024**2)}MB")
-        print(f"   ⚡ Lazy loading: {settings.LAZY_MODEL_LOADING}")
-        print(f"   🧹 Cleanup agresivo: {settings.AGGRESSIVE_CLEANUP}")
-        print(f"   🗜️ Compresión: {settings.RESPONSE_COMPRESSION}")
-        print(f"   📊 Log mínimo: {settings.MINIMAL_LOGGING}")
-        print(f"   🕒 Descarga modelo: {settings.MODEL_UNLOAD_TIMEOUT}s")
-        print(f"   🖥️ Dispositivo: {settings.DEVICE}")
-        print(f"   🔢 Tipo compute: {settings.COMPUTE_TYPE}")
+        settings = _get_settings()
+
+        # Con la precarga en curso DEVICE/COMPUTE_TYPE los fija su thread:
+        # leerlos recién cuando estén resueltos (no espera la carga del modelo)
+        model_loader = sys.modules.get("app.core.model_loader")
+        if model_loader is not None:
+            model_loader.wait_device_resolved()
+
+        if not QUIET:
+            _write(_CONFIG_TEMPLATE % (
+                settings.MODEL_SIZE,
+                settings.MAX_CONCURRENT_JOBS,
+                settings.MAX_FILE_SIZE // (1024**2),
+                settings.LAZY_MODEL_LOADING,
+                settings.AGGRESSIVE_CLEANUP,
+                settings.RESPONSE_COMPRESSION,
+                settings.MINIMAL_LOGGING,
+                settings.MODEL_UNLOAD_TIMEOUT,
+                settings.DEVICE,
+                settings.COMPUTE_TYPE,
+                ENV.get("OMP_NUM_THREADS", "-")
+            ))
 
         return settings
 
@@ -207,36 +461,130 @@ def load_config():
         sys.exit(1)
 
 
+def start_model_preload():
+    """
+    Disparar la carga del modelo en background (modo always-loaded)
+
+    El servidor corre en este mismo proceso: whisper_service espera esta
+    carga en vez de empezarla recién en el lifespan. Con --reload (DEBUG)
+    la app vive en otro proceso y la precarga se desperdiciaría.
+    """
+    try:
+        settings = _get_settings()
+        if settings.LAZY_MODEL_LOADING or settings.DEBUG:
+            return
+
+        # resolve_device (import de torch + init CUDA) corre en el thread de
+        # precarga, en paralelo con los chequeos; load_config espera a que
+        # DEVICE/COMPUTE_TYPE estén publicados antes de leerlos
+        from app.core import model_loader
+        model_loader.start_preload()
+        if not QUIET:
+            print("🧠 Precarga del modelo iniciada en background")
+    except Exception as e:
+        print(f"⚠️ No se pudo iniciar la precarga del modelo: {e}")
+
+
+class _ThreadBufferedStdout:
+    """
+    stdout que desvía la salida de los threads de chequeo a su propio buffer
+
+    Los chequeos paralelos imprimen sin intercalarse: cada bloque se vuelca
+    completo y en el orden de la lista al terminar.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        buffer = self._local.buffer = io.StringIO()
+        return buffer
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _run_captured(stdout: _ThreadBufferedStdout, check_func):
+    """Ejecutar un chequeo en un thread guardando su salida"""
+    buffer = stdout.capture()
+    try:
+        return check_func(), None, buffer
+    except Exception as e:
+        return None, e, buffer
+
+
 def run_startup_checks():
     """Ejecutar todas las verificaciones de inicio"""
     print_banner()
 
-    checks = [
+    # Secuenciales: la versión puede abortar y el entorno (OMP_NUM_THREADS,
+    # ...) debe estar aplicado antes de que el chequeo de GPU importe torch
+    sequential_checks = [
         ("Python version", check_python_version),
+        ("Environment setup", setup_environment)
+    ]
+
+    # Independientes entre sí: en paralelo, el arranque tarda lo que el
+    # más lento (import de torch o ping a Redis) y no la suma
+    parallel_checks = [
         ("System resources", check_system_resources),
         ("Dependencies", verify_dependencies),
-        ("Environment setup", setup_environment),
+        ("Redis connection", test_redis),
         ("GPU availability", check_gpu),
-        ("Redis connection", test_redis)
+        # FS lento/de red: el makedirs queda oculto bajo el chequeo más lento
+        ("Upload directory", ensure_upload_dir)
     ]
 
+    outcomes = []
+    for check_name, check_func in sequential_checks:
+        try:
+            outcomes.append((check_name, check_func(), None))
+        except Exception as e:
+            outcomes.append((check_name, None, e))
+
+    # Con el entorno ya aplicado, cargar el modelo en paralelo a los chequeos
+    start_model_preload()
+
+    stdout = sys.stdout
+    buffered = _ThreadBufferedStdout(stdout)
+    sys.stdout = buffered
+    try:
+        with ThreadPoolExecutor(max_workers=len(parallel_checks), thread_name_prefix="startup-check") as pool:
+            futures = [
+                (check_name, pool.submit(_run_captured, buffered, check_func))
+                for check_name, check_func in parallel_checks
+            ]
+            for check_name, future in futures:
+                result, error, output = future.result()
+                stdout.write(output.getvalue())
+                outcomes.append((check_name, result, error))
+    finally:
+        sys.stdout = stdout
+
     failed_checks = []
     warnings = []
 
-    for check_name, check_func in checks:
-        try:
-            result = check_func()
-            if not result:
-                if check_name in ["Redis connection"]:
-                    failed_checks.append(check_name)
-                else:
-                    warnings.append(check_name)
-        except Exception as e:
-            print(f"❌ Error en {check_name}: {e}")
+    for check_name, result, error in outcomes:
+        if error is not None:
+            print(f"❌ Error en {check_name}: {error}")
             if check_name in ["Redis connection", "Dependencies"]:
                 failed_checks.append(check_name)
             else:
                 warnings.append(check_name)
+        elif not result:
+            if check_name in ["Redis connection"]:
+                failed_checks.append(check_name)
+            else:
+                warnings.append(check_name)
 
     # Solo Redis y Dependencies son críticos
     if failed_checks:
@@ -248,44 +596,73 @@ def run_startup_checks():
         print(f"\n⚠️ Verificaciones con warnings: {', '.join(warnings)}")
         print("ℹ️ La API puede funcionar pero con limitaciones")
 
-    print("\n✅ Verificaciones completadas")
+    if not QUIET:
+        print("\n✅ Verificaciones completadas")
     return load_config()
 
 
+@lru_cache(maxsize=1)
+def get_server_config() -> MappingProxyType:
+    """
+    Configuración de uvicorn armada una sola vez (solo lectura)
+
+    Los settings no cambian después del arranque: se leen una vez acá y
+    no en el momento de levantar el servidor.
+    """
+    settings = _get_settings()
+
+    return MappingProxyType({
+        "app": "app.main:app",
+        "host": settings.HOST,
+        "port": settings.PORT,
+        "workers": 1,  # SIEMPRE 1 para máxima eficiencia de memoria
+        "log_level": "error" if settings.MINIMAL_LOGGING else "warning",
+        # Sin access log de uvicorn: app.main guarda cada request en un
+        # ring buffer (ver /admin/access-log) sin formatear strings
+        "access_log": False,
+        "server_header": False,  # Sin headers innecesarios
+        "date_header": False,    # Sin date header
+        "reload": settings.DEBUG,
+        # En DEBUG (--reload) el loop por defecto: sin importar uvloop
+        "loop": "asyncio" if settings.DEBUG else _LOOP,
+        "http": _HTTP,  # Parser C (uvicorn[standard]) en vez de h11
+        "limit_concurrency": settings.LIMIT_CONCURRENCY
+    })
+
+
 def start_server(settings):
     """Iniciar servidor optimizado"""
-    print(f"\n🚀 Iniciando servidor ultra-optimizado...")
-    print(f"   📍 URL: http://{settings.HOST}:{settings.PORT}")
-    print(f"   📚 Docs: http://{settings.HOST}:{settings.PORT}/docs")
-    print(f"   💾 Memoria: Uso mínimo garantizado")
-    print(f"   ⚡ Always-loaded: Modelo pre-cargado")
-    print("="*60)
+    # Configuración ultra-optimizada para máximo rendimiento
+    server_config = get_server_config()
+    host, port = server_config["host"], server_config["port"]
+
+    if not QUIET:
+        _write("\n".join((
+            "\n🚀 Iniciando servidor ultra-optimizado...",
+            f"   📍 URL: http://{host}:{port}",
+            f"   📚 Docs: http://{host}:{port}/docs",
+            "   💾 Memoria: Uso mínimo garantizado",
+            "   ⚡ Always-loaded: Modelo pre-cargado",
+            _RULE,
+            ""
+        )))
 
     try:
         import uvicorn
 
-        # Configuración ultra-optimizada para máximo rendimiento
-        server_config = {
-            "app": "app.main:app",
-            "host": settings.HOST,
-            "port": settings.PORT,
-            "workers": 1,  # SIEMPRE 1 para máxima eficiencia de memoria
-            "log_level": "error" if settings.MINIMAL_LOGGING else "warning",
-            "access_log": not settings.MINIMAL_LOGGING,
-            "server_header": False,  # Sin headers innecesarios
-            "date_header": False,    # Sin date header
-            "reload": settings.DEBUG,
-            "loop": "uvloop" if sys.platform != "win32" else "asyncio"
-        }
-
-        print("⚡ Configuración aplicada:")
-        print(f"   - Workers: {server_config['workers']} (óptimo para memoria)")
-        print(f"   - Log level: {server_config['log_level']}")
-        print(f"   - Access log: {server_config['access_log']}")
-        print(f"   - Event loop: {server_config['loop']}")
-
         start_time = time.time()
-        print(f"\n🎯 Servidor iniciando... (timestamp: {int(start_time)})")
+
+        if not QUIET:
+            _write("\n".join((
+                "⚡ Configuración aplicada:",
+                f"   - Workers: {server_config['workers']} (óptimo para memoria)",
+                f"   - Log level: {server_config['log_level']}",
+                f"   - Access log: {server_config['access_log']}",
+                f"   - Event loop: {server_config['loop']}",
+                f"   - HTTP parser: {server_config['http']}",
+                f"\n🎯 Servidor iniciando... (timestamp: {int(start_time)})",
+                ""
+            )))
 
         uvicorn.run(**server_config)
 
@@ -306,12 +683,7 @@ def main():
         # 1. Verificaciones de inicio
         settings = run_startup_checks()
 
-        # 2. Crear directorios necesarios
-        upload_dir = Path(settings.UPLOAD_DIR)
-        upload_dir.mkdir(exist_ok=True)
-        print(f"📁 Directorio de uploads: {upload_dir.absolute()}")
-
-        # 3. Iniciar servidor
+        # 2. Iniciar servidor (UPLOAD_DIR ya se creó durante los chequeos)
         start_server(settings)
 
     except KeyboardInterrupt:
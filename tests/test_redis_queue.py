@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("pydantic_settings")
+
+from app.core.redis_queue import OptimizedRedisQueue
+
+
+def _round_trip(data):
+    """Simular HSET + HGETALL con decode_responses=True"""
+    encoded = OptimizedRedisQueue._encode(data)
+    raw = {
+        field: value.decode() if isinstance(value, bytes) else str(value)
+        for field, value in encoded.items()
+    }
+    return OptimizedRedisQueue._decode(raw)
+
+
+def test_encode_decode_preserves_types():
+    data = {
+        "job_id": "abc123",
+        "filename": "audio.mp3",
+        "file_size": 123,
+        "created_at": 1700000000.25,
+        "flag": True,
+        "meta": {"a": 1},
+        "segments": [1, 2, 3],
+    }
+
+    assert _round_trip(dict(data)) == data
+
+
+def test_encode_skips_none_and_keeps_tag_like_strings():
+    decoded = _round_trip({"text": "\x00{}", "language": None, "number_like": "123"})
+
+    assert decoded == {"text": "\x00{}", "number_like": "123"}
+
+
+def test_decode_untagged_float_fields():
+    # started_at lo escribe el Lua de claim como string plano
+    assert OptimizedRedisQueue._decode({"started_at": "1700000000.5"}) == {"started_at": 1700000000.5}